@@ -0,0 +1,135 @@
+import argparse
+import csv
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from excel_processor import process_file, write_pivot_sheets
+from excel_writer import StreamingExcelWriter
+from pivot_cube import PivotCube
+from profiling import get_profiler
+
+def jobs_from_glob(patterns: List[str], output_dir: str) -> List[Tuple[str, str]]:
+    """Pair every file matching the patterns with an .xlsx output of the same base name in output_dir.
+
+    Files matched by more than one pattern are processed once.
+    """
+    jobs = []
+    seen = set()
+    for pattern in patterns:
+        for input_file in sorted(glob.glob(pattern)):
+            if os.path.abspath(input_file) in seen:
+                continue
+            seen.add(os.path.abspath(input_file))
+            name = os.path.splitext(os.path.basename(input_file))[0] + '.xlsx'
+            jobs.append((input_file, os.path.join(output_dir, name)))
+    return jobs
+
+def jobs_from_manifest(manifest_file: str) -> List[Tuple[str, str]]:
+    """Read input/output pairs from a CSV manifest with 'input' and 'output' columns."""
+    with open(manifest_file, newline='', encoding='utf-8') as f:
+        return [(row['input'], row['output']) for row in csv.DictReader(f)]
+
+def run_job(job: Tuple[str, str]) -> Tuple[str, str, Optional[PivotCube], Optional[str]]:
+    """Process one input/output pair, returning the cube on success or the error on failure."""
+    input_file, output_file = job
+    try:
+        if os.path.abspath(input_file) == os.path.abspath(output_file):
+            raise ValueError("Output file would overwrite the input file")
+        # Each worker reports its own stage timings when EXCEL_PROFILE is set
+        profiler = get_profiler()
+        profiler.context = {'command': 'batch', 'input': input_file}
+        cube = process_file(input_file, output_file, profiler=profiler)
+        profiler.report()
+        return input_file, output_file, cube, None
+    except Exception as e:
+        return input_file, output_file, None, str(e)
+
+def process_batch(jobs: List[Tuple[str, str]], workers: Optional[int] = None,
+                  combined_file: Optional[str] = None) -> List[Tuple[str, str, Optional[str]]]:
+    """Process many workbooks across a process pool and report each file's outcome.
+
+    Failures are collected per file instead of stopping the run. Jobs that
+    would write the same output file all fail without running. When
+    combined_file is given, the cubes of every successful file are merged and
+    written there as cross-org pivot sheets.
+    """
+    for output_dir in {os.path.dirname(output_file) for _, output_file in jobs}:
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+    # Two workers writing one file would both succeed while one output is lost
+    inputs_by_output: Dict[str, List[str]] = {}
+    for input_file, output_file in jobs:
+        inputs_by_output.setdefault(os.path.abspath(output_file), []).append(input_file)
+
+    results = []
+    combined = PivotCube()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [None if len(inputs_by_output[os.path.abspath(job[1])]) > 1 else executor.submit(run_job, job)
+                   for job in jobs]
+        for job, future in zip(jobs, futures):
+            if future is None:
+                others = [other for other in inputs_by_output[os.path.abspath(job[1])] if other != job[0]]
+                error = f"Output file is also the output of {', '.join(others)}" if others \
+                    else "Output file is listed more than once for this input"
+                results.append((job[0], job[1], error))
+                continue
+            try:
+                input_file, output_file, cube, error = future.result()
+            except Exception as e:
+                # The worker itself died, e.g. killed for running out of memory
+                input_file, output_file, cube, error = job[0], job[1], None, str(e)
+
+            if cube is not None:
+                combined.merge(cube)
+            results.append((input_file, output_file, error))
+
+    if combined_file and combined.counts:
+        with StreamingExcelWriter(combined_file) as writer:
+            write_pivot_sheets(writer, combined)
+
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the batch command line and return the process exit code."""
+    parser = argparse.ArgumentParser(description="Process many Excel exports in parallel.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--inputs', nargs='+', metavar='PATTERN',
+                        help="glob patterns of input workbooks")
+    source.add_argument('--manifest', help="CSV file with 'input' and 'output' columns")
+    parser.add_argument('--output-dir', help="directory for outputs when using --inputs")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument('--combined', help="write merged cross-org pivot sheets to this file")
+    args = parser.parse_args(argv)
+
+    if args.inputs:
+        if not args.output_dir:
+            parser.error("--output-dir is required with --inputs")
+        jobs = jobs_from_glob(args.inputs, args.output_dir)
+    else:
+        jobs = jobs_from_manifest(args.manifest)
+
+    if not jobs:
+        print("No input files found", file=sys.stderr)
+        return 1
+
+    results = process_batch(jobs, args.workers, args.combined)
+
+    failures = 0
+    for input_file, output_file, error in results:
+        if error is None:
+            print(f"OK      {input_file} -> {output_file}")
+        else:
+            failures += 1
+            print(f"FAILED  {input_file}: {error}", file=sys.stderr)
+
+    print(f"Processed {len(results) - failures} of {len(results)} files successfully.")
+    if args.combined and failures < len(results):
+        print(f"Combined pivot tables saved to: {args.combined}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+from generate_test_data import write_synthetic_workbook
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIZES = [1000, 100000, 1000000]
+
+# Slowdown beyond which a run counts as a regression against the baseline
+DEFAULT_THRESHOLD = 1.10
+
+# Commands benchmarked for every input size, with how to build their arguments
+COMMANDS = {
+    'process_excel': lambda input_file, work_dir: ['excel_processor.py', input_file, os.path.join(work_dir, 'output.xlsx')],
+    'generate_markdown': lambda input_file, work_dir: ['generate_markdown.py', input_file, os.path.join(work_dir, 'output.md')],
+}
+
+# Modules whose import cost is measured, from the lightweight CLI entry point to the full pipeline
+IMPORT_MODULES = ['cli', 'excel_processor', 'generate_markdown', 'verify_workbook']
+
+def input_path(data_dir: str, rows: int, seed: int) -> str:
+    """Return the path of the synthetic input for a size, generating it on first use."""
+    path = os.path.join(data_dir, f'synthetic_{rows}_{seed}.xlsx')
+    if not os.path.exists(path):
+        print(f"Generating {rows} row input: {path}", file=sys.stderr)
+        write_synthetic_workbook(path, rows, seed=seed)
+    return path
+
+def run_command(command: str, input_file: str, work_dir: str) -> Dict:
+    """Run one command in a fresh interpreter and collect its timing and memory figures."""
+    profile_file = os.path.join(work_dir, f'{command}.jsonl')
+    if os.path.exists(profile_file):
+        os.remove(profile_file)
+
+    env = dict(os.environ, EXCEL_PROFILE='1', EXCEL_PROFILE_OUTPUT=profile_file)
+    script, *script_args = COMMANDS[command](input_file, work_dir)
+    args = [sys.executable, os.path.join(SCRIPT_DIR, script)] + script_args
+
+    start = time.perf_counter()
+    subprocess.run(args, env=env, check=True, stdout=subprocess.DEVNULL)
+    elapsed = time.perf_counter() - start
+
+    with open(profile_file, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    stages = [record for record in records if 'stage' in record]
+    total = next(stage for stage in stages if stage['stage'] == 'total')
+
+    return {
+        'command': command,
+        'rows': total['rows'],
+        'process_wall_s': round(elapsed, 3),
+        'pipeline_wall_s': total['wall_s'],
+        'peak_rss_mb': total['peak_rss_mb'],
+        'stages': {stage['stage']: stage['wall_s'] for stage in stages if stage['stage'] != 'total'},
+        'counters': {record['counter']: record.get('hit_rate') for record in records if 'counter' in record},
+    }
+
+def run_benchmarks(sizes: List[int], commands: List[str], data_dir: str, seed: int = 0) -> List[Dict]:
+    """Benchmark every command at every size and return one result per run."""
+    os.makedirs(data_dir, exist_ok=True)
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for rows in sizes:
+            input_file = input_path(data_dir, rows, seed)
+            for command in commands:
+                result = run_command(command, input_file, work_dir)
+                print(f"{command:<18} {rows:>9} rows  {result['process_wall_s']:>9.3f}s  "
+                      f"{result['peak_rss_mb']:>9.1f} MB peak RSS")
+                results.append(result)
+    return results
+
+def measure_import(module: str) -> Dict:
+    """Import a module in a fresh interpreter with -X importtime and total its cost."""
+    args = [sys.executable, '-X', 'importtime', '-c', f'import {module}']
+    completed = subprocess.run(args, cwd=SCRIPT_DIR, check=True, capture_output=True, text=True)
+
+    # Lines look like "import time: self [us] | cumulative | imported package", with the
+    # package name indented two spaces per nesting level below the top-level import
+    import_us = 0
+    dependencies = []
+    children = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        # Direct dependencies print before their importer, so collect them until it appears
+        if depth == 1:
+            children.append((int(cumulative), name.strip()))
+        elif depth == 0:
+            if name.strip() == module:
+                import_us = int(cumulative)
+                dependencies = children
+            children = []
+
+    dependencies.sort(reverse=True)
+    return {
+        'module': module,
+        'import_s': round(import_us / 1e6, 4),
+        'slowest': [name for _, name in dependencies[:3]],
+    }
+
+def run_import_benchmarks(modules: List[str]) -> List[Dict]:
+    """Measure the import cost of every module and print one line each."""
+    imports = []
+    for module in modules:
+        result = measure_import(module)
+        print(f"import {module:<18} {result['import_s']:>9.3f}s  slowest: {', '.join(result['slowest'])}")
+        imports.append(result)
+    return imports
+
+def compare_to_baseline(results: List[Dict], baseline: List[Dict], threshold: float) -> bool:
+    """Print each run's change against the baseline and return whether any regressed."""
+    baseline_runs = {(run['command'], run['rows']): run for run in baseline}
+    regressed = False
+    for result in results:
+        previous = baseline_runs.get((result['command'], result['rows']))
+        if previous is None:
+            print(f"{result['command']:<18} {result['rows']:>9} rows  no baseline")
+            continue
+
+        time_ratio = result['process_wall_s'] / previous['process_wall_s']
+        memory_ratio = result['peak_rss_mb'] / previous['peak_rss_mb']
+        flag = ''
+        if time_ratio > threshold or memory_ratio > threshold:
+            flag = '  REGRESSION'
+            regressed = True
+        print(f"{result['command']:<18} {result['rows']:>9} rows  time x{time_ratio:.2f}  "
+              f"memory x{memory_ratio:.2f}{flag}")
+    return regressed
+
+def compare_imports_to_baseline(imports: List[Dict], baseline: List[Dict], threshold: float) -> bool:
+    """Print each module's import time change against the baseline and return whether any regressed."""
+    baseline_imports = {entry['module']: entry for entry in baseline}
+    regressed = False
+    for entry in imports:
+        previous = baseline_imports.get(entry['module'])
+        if previous is None or not previous['import_s']:
+            print(f"import {entry['module']:<18} no baseline")
+            continue
+
+        ratio = entry['import_s'] / previous['import_s']
+        flag = ''
+        if ratio > threshold:
+            flag = '  REGRESSION'
+            regressed = True
+        print(f"import {entry['module']:<18} time x{ratio:.2f}{flag}")
+    return regressed
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark command line and return the process exit code."""
+    parser = argparse.ArgumentParser(description="Benchmark imports, process_excel and generate_markdown on synthetic exports.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="row counts to benchmark")
+    parser.add_argument('--commands', nargs='+', choices=sorted(COMMANDS), default=sorted(COMMANDS),
+                        help="commands to benchmark")
+    parser.add_argument('--imports', nargs='*', default=IMPORT_MODULES, metavar='MODULE',
+                        help="modules whose import time is measured; pass none to skip")
+    parser.add_argument('--data-dir', default='benchmark_data', help="where generated inputs are kept between runs")
+    parser.add_argument('--seed', type=int, default=0, help="random seed for generated inputs")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--baseline', help="compare against results saved by an earlier --output")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="time or memory ratio above which a run counts as a regression")
+    args = parser.parse_args(argv)
+
+    # Import costs matter on their own for short, frequent runs
+    imports = run_import_benchmarks(args.imports)
+    results = run_benchmarks(args.sizes, args.commands, args.data_dir, args.seed)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'imports': imports, 'results': results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print("\nComparison with baseline:")
+        imports_regressed = compare_imports_to_baseline(imports, baseline.get('imports', []), args.threshold)
+        if compare_to_baseline(results, baseline['results'], args.threshold) or imports_regressed:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+import sys
+import time
+import random
+import pandas as pd
+from datetime import datetime, timedelta
+from excel_processor import get_quarter_str, derive_quarters
+
+def make_dates(rows: int) -> pd.Series:
+    """Build a Date column resembling an export: repeated dates, a few blanks and bad values."""
+    random.seed(0)
+    now = datetime.now()
+    distinct = [(now - timedelta(days=offset)).strftime('%Y-%m-%d') for offset in range(-180, 900, 3)]
+    values = []
+    for _ in range(rows):
+        roll = random.random()
+        if roll < 0.03:
+            values.append(None)
+        elif roll < 0.05:
+            values.append("")
+        elif roll < 0.06:
+            values.append("TBD")
+        else:
+            values.append(random.choice(distinct))
+    return pd.Series(values, dtype=object)
+
+def time_call(func, *args):
+    """Return the result of calling func and the elapsed wall time in seconds."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def run_benchmark(rows: int) -> None:
+    """Compare the per-row apply path with the column-wise quarter engine."""
+    dates = make_dates(rows)
+    
+    expected, apply_seconds = time_call(lambda d: d.apply(get_quarter_str), dates)
+    actual, vectorized_seconds = time_call(derive_quarters, dates)
+    
+    if expected.tolist() != actual.tolist():
+        print("ERROR: vectorized quarters differ from get_quarter_str", file=sys.stderr)
+        sys.exit(1)
+    
+    print(f"Rows: {rows}")
+    print(f"apply(get_quarter_str): {apply_seconds:.3f}s")
+    print(f"derive_quarters:        {vectorized_seconds:.3f}s")
+    print(f"Speedup:                {apply_seconds / vectorized_seconds:.1f}x")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print("Usage: python benchmark_quarters.py [rows]")
+        sys.exit(1)
+    
+    rows = int(sys.argv[1]) if len(sys.argv) == 2 else 100000
+    run_benchmark(rows)
@@ -0,0 +1,90 @@
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+# Command modules import pandas and openpyxl, which costs most of a second, so
+# they are only imported once a subcommand that needs them has been chosen.
+# Keep this module's own imports to the standard library.
+
+# Formats selectable on the command line; table_io maps file extensions to the same names
+INPUT_FORMATS = ['xlsx', 'csv', 'parquet', 'arrow']
+OUTPUT_FORMATS = ['xlsx', 'parquet']
+
+# Options read by date_utils; set in the environment so pool workers see them too
+DATE_ENV = {'as_of': 'EXCEL_AS_OF', 'date_format': 'EXCEL_DATE_FORMAT'}
+
+def run_process(args: argparse.Namespace) -> int:
+    """Write the Data and pivot sheets for one workbook."""
+    from excel_processor import process_excel
+    process_excel(args.input_file, args.output_file, profile=args.profile or None,
+                  input_format=args.input_format, output_format=args.output_format,
+                  shard_rows=args.max_rows, shard_files=args.shard_files, workers=args.workers,
+                  pivot_spec=args.pivot_spec)
+    return 0
+
+def run_markdown(args: argparse.Namespace) -> int:
+    """Write the markdown report for one workbook."""
+    from generate_markdown import generate_markdown
+    generate_markdown(args.input_file, args.output_file, profile=args.profile or None,
+                      input_format=args.input_format, workers=args.workers)
+    return 0
+
+def run_verify(args: argparse.Namespace) -> int:
+    """Check an output workbook's schema, quarters and pivot tables."""
+    from verify_workbook import main as verify_main
+    return verify_main([args.output_file] + (['--report', args.report] if args.report else [])
+                       + (['--shard-files'] if args.shard_files else [])
+                       + (['--pivot-spec', args.pivot_spec] if args.pivot_spec else []))
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for every subcommand."""
+    parser = argparse.ArgumentParser(description="Process goal exports into pivot workbooks and markdown reports.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    dates = argparse.ArgumentParser(add_help=False)
+    dates.add_argument('--as-of', help="treat this ISO date or datetime as now, for reproducible runs")
+    dates.add_argument('--date-format', help="strptime format of date cells, e.g. %%m/%%d/%%Y (default: inferred)")
+
+    process = commands.add_parser('process', parents=[dates], help="write the Data and pivot sheets for a workbook")
+    process.add_argument('input_file')
+    process.add_argument('output_file')
+    process.add_argument('--profile', action='store_true', help="report stage timings as JSON lines")
+    process.add_argument('--input-format', choices=INPUT_FORMATS, help="input format (default: from the extension)")
+    process.add_argument('--output-format', choices=OUTPUT_FORMATS,
+                         help="xlsx, or parquet for a directory with one file per sheet (default: from the extension)")
+    process.add_argument('--max-rows', type=int,
+                         help="rows per Data sheet before it continues on 'Data 2', ... (default: the worksheet limit)")
+    process.add_argument('--shard-files', action='store_true',
+                         help="put Data shards past the first in <output>_2.xlsx, ..., written in parallel")
+    process.add_argument('--workers', type=int, help="processes writing shard workbooks (default: one per CPU)")
+    process.add_argument('--pivot-spec', help="JSON or YAML file defining the pivot sheets (default: Goal Summary and Count by Quarter)")
+    process.set_defaults(run=run_process)
+
+    markdown = commands.add_parser('markdown', parents=[dates], help="write the markdown report for a workbook")
+    markdown.add_argument('input_file')
+    markdown.add_argument('output_file')
+    markdown.add_argument('--profile', action='store_true', help="report stage timings as JSON lines")
+    markdown.add_argument('--input-format', choices=INPUT_FORMATS, help="input format (default: from the extension)")
+    markdown.add_argument('--workers', type=int, help="processes rendering items in parallel (default: render serially)")
+    markdown.set_defaults(run=run_markdown)
+
+    verify = commands.add_parser('verify', parents=[dates], help="check an output workbook's schema, quarters and pivot tables")
+    verify.add_argument('output_file')
+    verify.add_argument('--report', help="write the JSON report to this file instead of stdout")
+    verify.add_argument('--shard-files', action='store_true', help="the output was written with process --shard-files")
+    verify.add_argument('--pivot-spec', help="the output was written with process --pivot-spec FILE")
+    verify.set_defaults(run=run_verify)
+
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the command line and return the process exit code."""
+    args = build_parser().parse_args(argv)
+    for option, variable in DATE_ENV.items():
+        if getattr(args, option):
+            os.environ[variable] = getattr(args, option)
+    return args.run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
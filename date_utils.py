@@ -0,0 +1,171 @@
+import os
+import warnings
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import pandas as pd
+
+# Freezes the clock for reproducible runs, e.g. EXCEL_AS_OF=2025-06-30
+AS_OF_ENV = 'EXCEL_AS_OF'
+
+# Parse dates with this strptime format instead of inferring one, e.g. EXCEL_DATE_FORMAT=%m/%d/%Y
+DATE_FORMAT_ENV = 'EXCEL_DATE_FORMAT'
+
+# Distinct single values remembered by parse_date
+DATE_CACHE_SIZE = 4096
+
+# Rows passed to parse_dates and distinct values actually parsed for them
+_column_stats = {'columns': 0, 'rows': 0, 'parsed': 0}
+
+@lru_cache(maxsize=8)
+def _parse_as_of(value: str) -> datetime:
+    """Parse an as-of setting once per distinct value."""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{AS_OF_ENV} must be an ISO date or datetime, got '{value}'") from None
+
+def now() -> datetime:
+    """Return the current time, or the frozen as-of time when EXCEL_AS_OF is set."""
+    as_of = os.environ.get(AS_OF_ENV)
+    return _parse_as_of(as_of) if as_of else datetime.now()
+
+def set_as_of(value: Optional[str]) -> None:
+    """Freeze the clock at an ISO date or datetime, or unfreeze it with None.
+
+    The setting lives in the environment so pool workers inherit it.
+    """
+    if value is None:
+        os.environ.pop(AS_OF_ENV, None)
+        return
+    _parse_as_of(value)
+    os.environ[AS_OF_ENV] = value
+
+def default_date_format() -> Optional[str]:
+    """Return the explicit date format configured through EXCEL_DATE_FORMAT, if any."""
+    return os.environ.get(DATE_FORMAT_ENV) or None
+
+def _wall_clock(parsed: pd.Series) -> pd.Series:
+    """Drop the timezone of tz-aware dates, keeping each one's local time as get_quarter_str reads it."""
+    if isinstance(parsed.dtype, pd.DatetimeTZDtype):
+        return parsed.dt.tz_localize(None)
+    return parsed
+
+def _has_offset(parsed: pd.Series) -> pd.Series:
+    """Flag the parsed dates that carry a UTC offset."""
+    if isinstance(parsed.dtype, pd.DatetimeTZDtype):
+        return parsed.notna()
+    return pd.Series(False, index=parsed.index)
+
+def _parse_one(value, date_format: Optional[str]):
+    """Parse a single value, or NaT if it isn't a date."""
+    try:
+        return pd.to_datetime(value, format=date_format)
+    except (ValueError, TypeError, OverflowError):
+        return pd.NaT
+
+def _parse_values(values: pd.Series, date_format: Optional[str]) -> Tuple[pd.Series, pd.Series]:
+    """Parse values with pd.to_datetime, turning blank or invalid values into NaT.
+
+    Dates with a UTC offset are kept at their local time without the offset;
+    the second series returned flags which ones had one.
+    """
+    try:
+        with warnings.catch_warnings():
+            # Columns without a single inferable format are expected; they fall back to per-value parsing
+            warnings.simplefilter('ignore', UserWarning)
+            parsed = pd.to_datetime(values, format=date_format, errors='coerce')
+        offsets = _has_offset(parsed)
+        parsed = _wall_clock(parsed)
+
+        if date_format is None:
+            # Values that don't match the inferred format get a second, per-value parse
+            # so mixed-format columns behave the same as parsing each cell on its own
+            blank = values.isna() | (values.astype(object) == "")
+            retry = parsed.isna() & ~blank
+            if retry.any():
+                retried = pd.to_datetime(values[retry], format='mixed', errors='coerce')
+                offsets[retry] = _has_offset(retried)
+                parsed[retry] = _wall_clock(retried)
+    except (ValueError, TypeError):
+        # Offsets that differ between values, or offsets next to naive dates, can't share
+        # one column type; parse those values one at a time instead
+        dates = [_parse_one(value, date_format) for value in values]
+        offsets = pd.Series([date is not pd.NaT and date.tzinfo is not None for date in dates],
+                            index=values.index, dtype=bool)
+        parsed = pd.to_datetime(pd.Series([date.tz_localize(None) if aware else date
+                                           for date, aware in zip(dates, offsets)],
+                                          index=values.index, dtype=object))
+
+    return parsed, offsets
+
+def parse_dates_with_offsets(values: pd.Series,
+                             date_format: Optional[str] = None) -> Tuple[pd.Series, pd.Series]:
+    """Parse a column of dates as parse_dates does, also flagging the dates that had a UTC offset."""
+    if date_format is None:
+        date_format = default_date_format()
+    if pd.api.types.is_datetime64_any_dtype(values.dtype) or pd.api.types.is_numeric_dtype(values.dtype):
+        return _parse_values(values, date_format)
+
+    # Text in any flavour (object, str, categorical) is factorized
+    codes, uniques = pd.factorize(values)
+    parsed, offsets = _parse_values(pd.Series(uniques.astype(object), dtype=object), date_format)
+    _column_stats['columns'] += 1
+    _column_stats['rows'] += len(values)
+    _column_stats['parsed'] += len(uniques)
+    # Blank rows (code -1) come out as NaT with no offset
+    return (pd.Series(parsed.array.take(codes, allow_fill=True), index=values.index),
+            pd.Series(offsets.reindex(codes, fill_value=False).to_numpy(), index=values.index))
+
+def parse_dates(values: pd.Series, date_format: Optional[str] = None) -> pd.Series:
+    """Parse a column of dates, turning blank or invalid values into NaT.
+
+    Each distinct value is parsed once and the results are mapped back onto
+    the rows. Distinct values keep the order they first appear in, so the
+    format pandas infers from the first of them is the one it would infer
+    from the whole column. Without date_format, EXCEL_DATE_FORMAT applies.
+    Dates with a UTC offset are kept at their local time without the offset.
+    """
+    return parse_dates_with_offsets(values, date_format)[0]
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_value(value, date_format: Optional[str]) -> Optional[pd.Timestamp]:
+    try:
+        return pd.to_datetime(value, format=date_format)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+def parse_date(value, date_format: Optional[str] = None) -> Optional[pd.Timestamp]:
+    """Parse one date value, remembering recent results; None if it isn't a date."""
+    if date_format is None:
+        date_format = default_date_format()
+    try:
+        return _parse_value(value, date_format)
+    except TypeError:
+        # Unhashable values can't be cached
+        return _parse_value.__wrapped__(value, date_format)
+
+def _column_summary(counts: Dict[str, int]) -> Dict:
+    """Add the share of rows that needed no parse of their own to column counters."""
+    rows, parsed = counts['rows'], counts['parsed']
+    return dict(counts, hit_rate=round(1 - parsed / rows, 4) if rows else None)
+
+def parse_stats() -> Dict[str, Dict]:
+    """Return how much parsing the column and single-value caches have saved so far."""
+    values = _parse_value.cache_info()
+    lookups = values.hits + values.misses
+    return {
+        'columns': _column_summary(_column_stats),
+        'values': {'lookups': lookups, 'hits': values.hits, 'misses': values.misses,
+                   'hit_rate': round(values.hits / lookups, 4) if lookups else None},
+    }
+
+def column_stats_since(start: Dict) -> Dict:
+    """Return the column parsing done since an earlier parse_stats()['columns'] snapshot."""
+    return _column_summary({key: count - start[key] for key, count in _column_stats.items()})
+
+def reset_parse_stats() -> None:
+    """Zero the counters and empty the single-value cache."""
+    for key in _column_stats:
+        _column_stats[key] = 0
+    _parse_value.cache_clear()
@@ -1,8 +1,15 @@
+import numpy as np
 import pandas as pd
 import sys
-from typing import List
-from datetime import datetime
-from openpyxl import load_workbook
+from typing import Dict, List, Optional
+from date_utils import now, parse_date, parse_dates, column_stats_since, parse_stats
+from excel_reader import DEFAULT_CHUNK_SIZE
+from excel_writer import StreamingExcelWriter
+from table_io import open_writer
+from pivot_cube import PivotCube
+from pivot_spec import PivotPlan, PivotSpec, load_pivot_specs
+from profiling import Profiler, get_profiler, pop_profile_flag
+from workbook_cache import load_batches
 
 def get_quarter_str(date_str: str) -> str:
     """Convert date to quarter string with year suffix if not current year."""
@@ -10,9 +17,11 @@ def get_quarter_str(date_str: str) -> str:
         return ""
     
     try:
-        date = pd.to_datetime(date_str)
+        date = parse_date(date_str)
+        if date is None:
+            return ""
         quarter = (date.month - 1) // 3 + 1
-        current_year = datetime.now().year
+        current_year = now().year
         
         if date.year == current_year:
             return f"Q{quarter}"
@@ -22,119 +31,230 @@ def get_quarter_str(date_str: str) -> str:
     except:
         return ""
 
-def ensure_columns(df: pd.DataFrame, required_columns: List[str]) -> pd.DataFrame:
-    """Ensure all required columns exist in the DataFrame."""
-    # First ensure all required columns exist
+def derive_quarters(dates: pd.Series, date_format: Optional[str] = None,
+                    reference_year: Optional[int] = None) -> pd.Series:
+    """Column-wise equivalent of ``dates.apply(get_quarter_str)`` returning a categorical."""
+    if reference_year is None:
+        reference_year = now().year
+    
+    parsed = parse_dates(dates, date_format)
+    valid = parsed.notna()
+    
+    # Encode each date as year * 10 + quarter and build one label per distinct key
+    keys = (parsed.dt.year[valid] * 10 + parsed.dt.quarter[valid]).astype(int)
+    labels = {}
+    for key in keys.unique():
+        year, quarter = divmod(int(key), 10)
+        if year == reference_year:
+            labels[key] = f"Q{quarter}"
+        else:
+            labels[key] = f"Q{quarter}'{str(year)[-2:]}"
+    
+    quarters = pd.Series("", index=dates.index, dtype=object)
+    quarters[valid] = keys.map(labels)
+    
+    # Sorted categories keep pivot column order the same as with plain strings
+    return quarters.astype(pd.CategoricalDtype(sorted(quarters.unique())))
+
+def placeholder_column(index: pd.Index) -> pd.Series:
+    """Constant empty-string column stored as one-byte categorical codes."""
+    codes = np.zeros(len(index), dtype=np.int8)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=[""]), index=index)
+
+def ensure_columns(df: pd.DataFrame, required_columns: List[str],
+                   date_format: Optional[str] = None,
+                   reference_year: Optional[int] = None) -> pd.DataFrame:
+    """Ensure all required columns exist in the DataFrame, held in their compact dtypes."""
+    columns = {}
     for column in required_columns:
         if column not in df.columns:
-            df[column] = ""  # Add empty column if it doesn't exist
+            columns[column] = placeholder_column(df.index)  # Add empty column if it doesn't exist
+        elif column in CATEGORICAL_COLUMNS:
+            columns[column] = df[column].astype('category')
+        else:
+            columns[column] = df[column]
     
     # Add Quarter column based on Date column
-    df['Quarter'] = df['Date'].apply(get_quarter_str)
+    dates = columns['Date'] if 'Date' in columns else df['Date']
+    columns['Quarter'] = derive_quarters(dates, date_format, reference_year)
     
     # Add Quarter to required columns if not already present
     if 'Quarter' not in required_columns:
         required_columns = required_columns + ['Quarter']
     
-    return df[required_columns]  # Reorder columns to match required order
+    # Assemble the columns in required order without copying their data
+    return pd.DataFrame({column: columns[column] for column in required_columns}, copy=False)
 
-def create_pivot_tables(df: pd.DataFrame, output_file: str) -> None:
-    """Create pivot tables in separate sheets for data analysis using pandas."""
-    # Create Goal Summary pivot table
-    goal_summary = pd.pivot_table(
-        df,
-        values='ID',
-        index=['Team'],
-        columns='Status',
-        aggfunc='count',
-        fill_value=0,
-        margins=True,
-        margins_name='Total'
-    ).reset_index()
+def pivot_sheet_frames(cube: PivotCube) -> Dict[str, pd.DataFrame]:
+    """Build the Goal Summary and Count by Quarter sheets as they are written, rolled up from the cube."""
+    # Create Goal Summary pivot table as a roll-up of the cube
+    goal_summary = cube.pivot(index=['Team'], columns='Status').reset_index()
     
     # Add Goal Set column for filtering
-    unique_goal_sets = df['Goal Set'].unique()
     goal_summary.insert(0, 'Goal Set', '')  # Add empty Goal Set column for filtering
     
-    # Create Count by Quarter pivot table
-    count_by_quarter = pd.pivot_table(
-        df,
-        values='ID',
-        index=['Team', 'Status'],
-        columns='Quarter',
-        aggfunc='count',
-        fill_value=0,
-        margins=True,
-        margins_name='Total'
-    ).reset_index()
+    # Create Count by Quarter pivot table as a roll-up of the cube
+    count_by_quarter = cube.pivot(index=['Team', 'Status'], columns='Quarter').reset_index()
     
     # Add Goal Set column for filtering
     count_by_quarter.insert(0, 'Goal Set', '')  # Add empty Goal Set column for filtering
     
+    return {'Goal Summary': goal_summary, 'Count by Quarter': count_by_quarter}
+
+def write_sheets(writer: StreamingExcelWriter, frames: Dict[str, pd.DataFrame]) -> None:
+    """Write pivot tables as sheets, each with an auto-filter."""
+    # Write each pivot table with filters
+    for sheet_name, frame in frames.items():
+        writer.write_frame(sheet_name, frame)
+        writer.set_auto_filter(sheet_name)
+
+def write_pivot_sheets(writer: StreamingExcelWriter, cube: PivotCube) -> None:
+    """Write the Goal Summary and Count by Quarter sheets rolled up from the cube."""
+    write_sheets(writer, pivot_sheet_frames(cube))
+
+def create_pivot_tables(df: pd.DataFrame, output_file: str,
+                        cube: Optional[PivotCube] = None,
+                        engine: Optional[str] = None) -> None:
+    """Create pivot tables in separate sheets for data analysis using pandas."""
+    # Count every (Goal Set, Team, Status, Quarter) combination once unless the caller already has
+    if cube is None:
+        cube = PivotCube().update(df)
+    
     # Write data and pivot tables to Excel file
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-        # Write original data
-        df.to_excel(writer, sheet_name='Data', index=False)
-        
-        # Write Goal Summary pivot table
-        goal_summary.to_excel(writer, sheet_name='Goal Summary', index=False)
-        
-        # Write Count by Quarter pivot table
-        count_by_quarter.to_excel(writer, sheet_name='Count by Quarter', index=False)
-        
-        # Get workbook to apply filters
-        workbook = writer.book
-        
-        # Configure Goal Summary sheet with filters
-        goal_summary_sheet = workbook['Goal Summary']
-        goal_summary_sheet.auto_filter.ref = goal_summary_sheet.dimensions
+    with open_writer(output_file, engine=engine) as writer:
+        writer.write_frame('Data', df)
+        write_pivot_sheets(writer, cube)
+
+# Columns every output Data sheet has, in order; Quarter is appended after them
+REQUIRED_COLUMNS = [
+    "Type", "Title + Description", "Description + PTG", 
+    "Desc + Status Comments + PTG", "Description + Status Comments",
+    "Status Comments + PTG", "Target Year", "Tags", "State", "Start Date",
+    "Stakeholders", "SOX In-Scope", "So What?", "Secondary SVPs",
+    "Secondary Owners", "Second Level Category", "Requirements", "PR/FAQ",
+    "Project Type", "Risks", "Dependencies", "Priority", "Primary SVP",
+    "Primary Benefits", "Parent Items (Related)", "Need By Date",
+    "Modified By", "LT Members", "Internal ID", "Goal Origin ID",
+    "Goal Origin", "Goal Measurements", "Followers", "First Level Category",
+    "Finance Owners", "Draft", "Design Review State", "Created By",
+    "Countries", "Contributors", "Child Items (Related)", "Attachments",
+    "Additional Details", "Row Number", "ID", "Team", "Goal Set", "Title",
+    "Status", "Orig Due Date", "Date", "Completion Date",
+    "Status Comments", "Path to Green", "Modified", "Created", "Owners",
+    "Description"
+]
+
+# Low-cardinality columns held as categoricals; a handful of values repeat down every row
+CATEGORICAL_COLUMNS = ['Status', 'Team', 'Goal Set', 'Type', 'Priority', 'State']
+
+def process_file(input_file: str, output_file: str,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 engine: Optional[str] = None,
+                 cache_dir: Optional[str] = None,
+                 profiler: Optional[Profiler] = None,
+                 input_format: Optional[str] = None,
+                 output_format: Optional[str] = None,
+                 shard_rows: Optional[int] = None,
+                 shard_files: bool = False,
+                 workers: Optional[int] = None,
+                 pivot_specs: Optional[List[PivotSpec]] = None) -> Optional[PivotCube]:
+    """Write the Data and pivot sheets for one workbook and return the cube behind the default pivots.
+
+    The input can be xlsx, CSV, Parquet or Arrow and the output xlsx or a
+    directory of Parquet files, chosen by the format arguments or the
+    file extensions. A Data sheet longer than shard_rows continues on
+    further sheets, or further workbooks with shard_files; the pivots
+    always count every row. pivot_specs replace the default pivot sheets
+    with the ones they define, all computed in the same pass; no cube is
+    built or returned then.
+    """
+    if profiler is None:
+        profiler = Profiler()
+    
+    # Capture the reference year once so every row is labelled against the same clock
+    reference_year = now().year
+    # Parsing counters are process-wide; report only this run's share of them
+    parse_start = parse_stats()['columns']
+    
+    with profiler.stage('total') as total:
+        # Stream the input Excel file in batches: normalize columns, count pivot keys
+        # and write each batch straight to the Data sheet as it arrives
+        plan = PivotPlan(pivot_specs) if pivot_specs else None
+        cube = PivotCube() if plan is None else None
+        writer = open_writer(output_file, output_format, engine, shard_rows, shard_files, workers)
+        try:
+            batches = load_batches(input_file, chunk_size=chunk_size, cache_dir=cache_dir,
+                                   input_format=input_format)
+            for batch in profiler.iterate('read', batches):
+                with profiler.stage('normalize') as stage:
+                    batch = ensure_columns(batch, REQUIRED_COLUMNS, reference_year=reference_year)
+                    stage.rows += len(batch)
+                
+                with profiler.stage('aggregate') as stage:
+                    if plan is None:
+                        cube.update(batch)
+                    else:
+                        plan.update(batch)
+                    stage.rows += len(batch)
+                
+                with profiler.stage('write_data') as stage:
+                    writer.write_frame('Data', batch)
+                    stage.rows += len(batch)
+                
+                total.rows += len(batch)
+            
+            # Create pivot tables once every row has been counted
+            with profiler.stage('write_pivots'):
+                if plan is None:
+                    write_pivot_sheets(writer, cube)
+                else:
+                    write_sheets(writer, plan.frames())
+        except BaseException:
+            # Leave no partial output behind
+            writer.discard()
+            raise
         
-        # Configure Count by Quarter sheet with filters
-        count_by_quarter_sheet = workbook['Count by Quarter']
-        count_by_quarter_sheet.auto_filter.ref = count_by_quarter_sheet.dimensions
+        with profiler.stage('save'):
+            writer.close()
+    
+    profiler.counters['date_parse'] = column_stats_since(parse_start)
+    return cube
 
-def process_excel(input_file: str, output_file: str) -> None:
+def process_excel(input_file: str, output_file: str,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  engine: Optional[str] = None,
+                  cache_dir: Optional[str] = None,
+                  profile: Optional[bool] = None,
+                  input_format: Optional[str] = None,
+                  output_format: Optional[str] = None,
+                  shard_rows: Optional[int] = None,
+                  shard_files: bool = False,
+                  workers: Optional[int] = None,
+                  pivot_spec: Optional[str] = None) -> None:
     """Process the Excel file and ensure it has all required columns."""
-    # Define required columns
-    required_columns = [
-        "Type", "Title + Description", "Description + PTG", 
-        "Desc + Status Comments + PTG", "Description + Status Comments",
-        "Status Comments + PTG", "Target Year", "Tags", "State", "Start Date",
-        "Stakeholders", "SOX In-Scope", "So What?", "Secondary SVPs",
-        "Secondary Owners", "Second Level Category", "Requirements", "PR/FAQ",
-        "Project Type", "Risks", "Dependencies", "Priority", "Primary SVP",
-        "Primary Benefits", "Parent Items (Related)", "Need By Date",
-        "Modified By", "LT Members", "Internal ID", "Goal Origin ID",
-        "Goal Origin", "Goal Measurements", "Followers", "First Level Category",
-        "Finance Owners", "Draft", "Design Review State", "Created By",
-        "Countries", "Contributors", "Child Items (Related)", "Attachments",
-        "Additional Details", "Row Number", "ID", "Team", "Goal Set", "Title",
-        "Status", "Orig Due Date", "Date", "Completion Date",
-        "Status Comments", "Path to Green", "Modified", "Created", "Owners",
-        "Description"
-    ]
+    # Stage timings are emitted as JSON lines when profiling is on (--profile or EXCEL_PROFILE)
+    profiler = get_profiler(profile)
+    profiler.context = {'command': 'process_excel', 'input': input_file}
     
     try:
-        # Read the input Excel file
-        df = pd.read_excel(input_file)
-        
-        # Ensure all required columns exist and are in the correct order
-        df = ensure_columns(df, required_columns)
-        
-        # Create pivot tables and write to output file
-        create_pivot_tables(df, output_file)
+        pivot_specs = load_pivot_specs(pivot_spec) if pivot_spec else None
+        process_file(input_file, output_file, chunk_size, engine, cache_dir, profiler,
+                     input_format, output_format, shard_rows, shard_files, workers, pivot_specs)
         
         print(f"Successfully processed Excel file and created pivot tables. Output saved to: {output_file}")
         
     except Exception as e:
         print(f"Error processing Excel file: {str(e)}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        profiler.report()
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python excel_processor.py <input_file> <output_file>")
+    args, profile = pop_profile_flag(sys.argv[1:])
+    if len(args) != 2:
+        print("Usage: python excel_processor.py [--profile] <input_file> <output_file>")
         sys.exit(1)
     
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
-    process_excel(input_file, output_file)
+    input_file = args[0]
+    output_file = args[1]
+    process_excel(input_file, output_file, profile=profile or None)
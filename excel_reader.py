@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+from typing import Iterator, List, Optional
+from openpyxl import load_workbook
+from pandas.io.parsers import TextParser
+
+DEFAULT_CHUNK_SIZE = 50000
+
+# Rows read together to settle each column's dtype before the first batch is yielded
+SCHEMA_ROWS = 50000
+
+def _convert_value(value):
+    """Convert a raw cell value the same way pd.read_excel does."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def _conform(column: pd.Series, dtype) -> pd.Series:
+    """Give a batch's column the dtype settled for it, where its values allow."""
+    if column.dtype == dtype:
+        return column
+    if dtype == object:
+        # Missing values read as NaN in object columns, whatever the batch inferred
+        return column.astype(object).where(column.notna(), np.nan)
+    if column.isna().all() or (pd.api.types.is_float_dtype(dtype) and pd.api.types.is_integer_dtype(column.dtype)) \
+            or (pd.api.types.is_datetime64_dtype(dtype) and pd.api.types.is_datetime64_dtype(column.dtype)):
+        try:
+            return column.astype(dtype)
+        except (ValueError, TypeError):
+            return column
+    # Values the settled dtype can't hold keep the dtype inferred for them
+    return column
+
+def _to_frame(header: List, rows: List[List], start: int, dtypes: Optional[pd.Series] = None) -> pd.DataFrame:
+    """Parse one batch of raw rows into a DataFrame with the sheet's header and, if given, its dtypes."""
+    # TextParser applies the same NA handling and dtype inference as pd.read_excel
+    batch = TextParser([header] + rows, header=0).read()
+    batch.index = pd.RangeIndex(start, start + len(batch))
+    if dtypes is not None:
+        for name, dtype in dtypes.items():
+            batch[name] = _conform(batch[name], dtype)
+    return batch
+
+def _split(frame: pd.DataFrame, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield a DataFrame in slices of chunk_size rows; an empty one is yielded as is."""
+    if len(frame) <= chunk_size:
+        yield frame
+        return
+    for offset in range(0, len(frame), chunk_size):
+        yield frame.iloc[offset:offset + chunk_size]
+
+def open_workbook(input_file: str):
+    """Open a workbook in read-only mode for streaming its rows."""
+    return load_workbook(input_file, read_only=True, data_only=True, keep_links=False)
+
+def iter_sheet_batches(sheet, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame batches of at most chunk_size rows from an open read-only worksheet.
+
+    Column dtypes are inferred once, over the first SCHEMA_ROWS rows or the
+    first batch if that is larger, and later batches are given the same
+    dtypes, so the batches don't depend on chunk_size.
+    """
+    sheet.reset_dimensions()
+    rows = sheet.iter_rows(values_only=True)
+
+    # Header row defines the schema for every batch
+    header = [_convert_value(value) for value in next(rows, ())]
+    while header and header[-1] == "":
+        header.pop()
+    if not header:
+        yield pd.DataFrame()
+        return
+    width = len(header)
+
+    # Hold back whole batches until the dtypes are settled
+    schema_rows = max(SCHEMA_ROWS // chunk_size, 1) * chunk_size
+    dtypes = None
+
+    batch = []
+    pending_empty = []
+    start = 0
+    for row in rows:
+        converted = [_convert_value(value) for value in row[:width]]
+        converted += [""] * (width - len(converted))
+
+        # Hold back empty rows until we know they are not trailing
+        if all(value == "" for value in converted):
+            pending_empty.append(converted)
+            continue
+        batch.extend(pending_empty)
+        pending_empty = []
+        batch.append(converted)
+
+        if len(batch) >= (schema_rows if dtypes is None else chunk_size):
+            ready = len(batch) - len(batch) % chunk_size
+            frame = _to_frame(header, batch[:ready], start, dtypes)
+            if dtypes is None:
+                dtypes = frame.dtypes
+            yield from _split(frame, chunk_size)
+            start += ready
+            batch = batch[ready:]
+
+    if batch or start == 0:
+        yield from _split(_to_frame(header, batch, start, dtypes), chunk_size)
+
+def iter_excel_batches(input_file: str, sheet_name: Optional[str] = None,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame batches of at most chunk_size rows from an Excel sheet.
+
+    Rows are streamed through openpyxl's read-only mode, so only one batch of
+    rows, or the first SCHEMA_ROWS rows while column dtypes are settled, is
+    held in memory at a time. Every batch has the columns and dtypes of the
+    first rows and a RangeIndex continuing from the previous batch. At least
+    one batch, possibly empty, is always yielded.
+    """
+    workbook = open_workbook(input_file)
+    try:
+        sheet = workbook[sheet_name] if sheet_name is not None else workbook.worksheets[0]
+        yield from iter_sheet_batches(sheet, chunk_size)
+    finally:
+        workbook.close()
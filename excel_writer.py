@@ -0,0 +1,197 @@
+import datetime
+import os
+import pandas as pd
+from typing import Dict, Iterator, Optional
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+
+# Number formats pandas applies when writing dates through pd.ExcelWriter
+DATETIME_FORMAT = 'YYYY-MM-DD HH:MM:SS'
+DATE_FORMAT = 'YYYY-MM-DD'
+
+def _has_dates(column: pd.Series) -> bool:
+    """Check whether a column can hold date or datetime values."""
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return True
+    if column.dtype != object:
+        return False
+    return pd.api.types.infer_dtype(column, skipna=True) not in ('empty', 'string', 'integer', 'floating', 'boolean')
+
+def _frame_rows(df: pd.DataFrame, to_date_cell) -> Iterator[tuple]:
+    """Yield the rows of a DataFrame as tuples of plain Python values ready for writing."""
+    columns = []
+    for name in df.columns:
+        column = df[name]
+        values = column.astype(object).where(column.notna(), None)
+        if _has_dates(column):
+            values = values.map(lambda value: to_date_cell(value) if isinstance(value, datetime.date) else value)
+        columns.append(values.tolist())
+    return zip(*columns)
+
+class OpenpyxlStreamWriter:
+    """Workbook writer built on openpyxl's write-only mode.
+
+    Rows are serialized as soon as they are appended, so memory use does not
+    grow with the number of rows written.
+    """
+
+    def __init__(self, output_file: str):
+        self.output_file = output_file
+        self.workbook = Workbook(write_only=True)
+        self.sheets = {}
+        self.shapes: Dict[str, list] = {}
+
+    def _date_cell(self, sheet, value):
+        """Wrap a date value in a cell carrying the same number format pandas uses."""
+        cell = WriteOnlyCell(sheet, value)
+        cell.number_format = DATETIME_FORMAT if isinstance(value, datetime.datetime) else DATE_FORMAT
+        return cell
+
+    def write_frame(self, sheet_name: str, df: pd.DataFrame) -> None:
+        """Append a DataFrame to a sheet, writing the header row the first time the sheet is used."""
+        if sheet_name not in self.sheets:
+            sheet = self.workbook.create_sheet(sheet_name)
+            sheet.append(list(df.columns))
+            self.sheets[sheet_name] = sheet
+            self.shapes[sheet_name] = [1, len(df.columns)]
+
+        sheet = self.sheets[sheet_name]
+        for row in _frame_rows(df, lambda value: self._date_cell(sheet, value)):
+            sheet.append(row)
+        self.shapes[sheet_name][0] += len(df)
+
+    def set_auto_filter(self, sheet_name: str) -> None:
+        """Apply an auto-filter over everything written to a sheet."""
+        rows, columns = self.shapes[sheet_name]
+        self.sheets[sheet_name].auto_filter.ref = f"A1:{get_column_letter(columns)}{rows}"
+
+    def close(self) -> None:
+        """Save the workbook to the output file."""
+        self.workbook.save(self.output_file)
+
+    def discard(self) -> None:
+        """Drop the workbook without saving it, finishing each sheet's stream of rows."""
+        for sheet in self.sheets.values():
+            sheet.close()
+        self.sheets.clear()
+
+class XlsxwriterStreamWriter:
+    """Workbook writer built on xlsxwriter's constant-memory mode."""
+
+    def __init__(self, output_file: str):
+        import xlsxwriter
+        self.output_file = output_file
+        # Keep URLs as plain text, as openpyxl and pd.ExcelWriter write them; links also cap out at ~65k a sheet
+        self.workbook = xlsxwriter.Workbook(output_file, {'constant_memory': True, 'strings_to_urls': False})
+        self.datetime_format = self.workbook.add_format({'num_format': DATETIME_FORMAT})
+        self.date_format = self.workbook.add_format({'num_format': DATE_FORMAT})
+        self.sheets = {}
+        self.shapes: Dict[str, list] = {}
+
+    def write_frame(self, sheet_name: str, df: pd.DataFrame) -> None:
+        """Append a DataFrame to a sheet, writing the header row the first time the sheet is used."""
+        if sheet_name not in self.sheets:
+            sheet = self.workbook.add_worksheet(sheet_name)
+            sheet.write_row(0, 0, list(df.columns))
+            self.sheets[sheet_name] = sheet
+            self.shapes[sheet_name] = [1, len(df.columns)]
+
+        sheet = self.sheets[sheet_name]
+        row_number = self.shapes[sheet_name][0]
+        for row in _frame_rows(df, lambda value: value):
+            for column_number, value in enumerate(row):
+                if value is None:
+                    continue
+                if isinstance(value, datetime.datetime):
+                    sheet.write_datetime(row_number, column_number, value, self.datetime_format)
+                elif isinstance(value, datetime.date):
+                    sheet.write_datetime(row_number, column_number, value, self.date_format)
+                else:
+                    sheet.write(row_number, column_number, value)
+            row_number += 1
+        self.shapes[sheet_name][0] = row_number
+
+    def set_auto_filter(self, sheet_name: str) -> None:
+        """Apply an auto-filter over everything written to a sheet."""
+        rows, columns = self.shapes[sheet_name]
+        self.sheets[sheet_name].autofilter(0, 0, rows - 1, columns - 1)
+
+    def close(self) -> None:
+        """Save the workbook to the output file."""
+        self.workbook.close()
+
+    def discard(self) -> None:
+        """Finish the workbook so it isn't saved on garbage collection; the caller removes the file."""
+        self.workbook.close()
+
+WRITER_ENGINES = {
+    'openpyxl': OpenpyxlStreamWriter,
+    'xlsxwriter': XlsxwriterStreamWriter,
+}
+
+def temp_path(output_file: str) -> str:
+    """Name the file an output is built in before it replaces output_file."""
+    directory, name = os.path.split(output_file)
+    return os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+
+def default_engine() -> str:
+    """Prefer xlsxwriter when it is installed, otherwise fall back to openpyxl."""
+    try:
+        import xlsxwriter  # noqa: F401
+        return 'xlsxwriter'
+    except ImportError:
+        return 'openpyxl'
+
+class StreamingExcelWriter:
+    """Context manager that streams DataFrames into a workbook with a pluggable engine.
+
+    The workbook is built in a temporary file next to the output and only
+    replaces it once closed, so a failed run never leaves a partial workbook.
+    """
+
+    def __init__(self, output_file: str, engine: Optional[str] = None):
+        engine = engine or default_engine()
+        if engine not in WRITER_ENGINES:
+            raise ValueError(f"Unknown Excel writer engine: {engine}")
+        self.engine = engine
+        self.output_file = output_file
+        self.temp_file = temp_path(output_file)
+        self.writer = WRITER_ENGINES[engine](self.temp_file)
+
+    def write_frame(self, sheet_name: str, df: pd.DataFrame) -> None:
+        """Append a DataFrame to a sheet, creating the sheet on first use."""
+        self.writer.write_frame(sheet_name, df)
+
+    def set_auto_filter(self, sheet_name: str) -> None:
+        """Apply an auto-filter over everything written to a sheet."""
+        self.writer.set_auto_filter(sheet_name)
+
+    def close(self) -> None:
+        """Finish the workbook and save it to the output file."""
+        try:
+            self.writer.close()
+        except BaseException:
+            self._remove_temp_file()
+            raise
+        os.replace(self.temp_file, self.output_file)
+
+    def discard(self) -> None:
+        """Abandon the workbook, leaving any existing output file untouched."""
+        try:
+            self.writer.discard()
+        finally:
+            self._remove_temp_file()
+
+    def _remove_temp_file(self) -> None:
+        if os.path.exists(self.temp_file):
+            os.remove(self.temp_file)
+
+    def __enter__(self) -> 'StreamingExcelWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
@@ -1,6 +1,13 @@
 import pandas as pd
-from datetime import datetime, timedelta
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+import string
 import sys
+from excel_reader import DEFAULT_CHUNK_SIZE
+from date_utils import now, parse_dates_with_offsets, column_stats_since, parse_stats
+from profiling import Profiler, get_profiler, pop_profile_flag
+from workbook_cache import load_batches
 
 def get_status_order():
     """Return the ordered list of status values."""
@@ -10,123 +17,253 @@ def is_standard_status(status):
     """Check if the status is one of the standard statuses."""
     return status in ['Completed', 'Completed Late', 'DNM', 'Cancelled', 'Red', 'Yellow']
 
-def is_within_past_days(date_str, days=100):
-    """Check if the given date is within the specified number of days from now."""
-    if pd.isna(date_str):
-        return False
-    try:
-        date = pd.to_datetime(date_str)
-        days_ago = datetime.now() - timedelta(days=days)
-        return date >= days_ago
-    except:
-        return False
-
-def should_include_item(row):
-    """Determine if an item should be included based on status and date criteria."""
-    status = row['Status']
-    
-    # For Red and Yellow items, always include
-    if status in ['Red', 'Yellow']:
-        return True
-    
-    # For Completed, Completed Late, DNM, Cancelled - check Modified date
-    if status in ['Completed', 'Completed Late', 'DNM', 'Cancelled']:
-        return is_within_past_days(row['Modified'])
+# Date column that decides whether an item is recent enough, by status.
+# Statuses not listed here (Green and all non-standard statuses) use Created.
+STATUS_DATE_RULES = {
+    'Red': 'always',
+    'Yellow': 'always',
+    'Completed': 'Modified',
+    'Completed Late': 'Modified',
+    'DNM': 'Modified',
+    'Cancelled': 'Modified',
+}
+
+def get_cutoff(days=100):
+    """Return the timestamp items must be on or after to count as recent."""
+    return pd.Timestamp(now() - timedelta(days=days))
+
+def inclusion_mask(df, cutoff):
+    """Determine which items should be included based on status and date criteria."""
+    rules = df['Status'].map(STATUS_DATE_RULES).fillna('Created')
     
-    # For Green items - check Created date
-    if status == 'Green':
-        return is_within_past_days(row['Created'])
+    # Parsed dates are naive local times, so compare them with a naive cutoff too
+    cutoff = pd.Timestamp(cutoff)
+    if cutoff.tzinfo is not None:
+        cutoff = cutoff.tz_localize(None)
     
-    # For non-standard statuses - check Created date
-    if not is_standard_status(status):
-        return is_within_past_days(row['Created'])
+    # Parse each date column once; blank or unparseable dates are never recent, and
+    # neither are dates with a UTC offset, which never compared with the naive cutoff
+    modified, modified_offset = parse_dates_with_offsets(df['Modified'])
+    created, created_offset = parse_dates_with_offsets(df['Created'])
+    modified_recent = (modified >= cutoff) & ~modified_offset
+    created_recent = (created >= cutoff) & ~created_offset
     
-    return False
+    return (
+        (rules == 'always') |
+        ((rules == 'Modified') & modified_recent) |
+        ((rules == 'Created') & created_recent)
+    )
+
+# Markdown template for a single item: each line is written only when every
+# column it lists has a value. An empty line always ends the item.
+ITEM_TEMPLATE = [
+    ((), "**[{Status}] {Goal Set} Goal [{ID}] {Title} on {Date}**"),
+    ((), "{Description}"),
+    (('Status Comments',), "**Status Comments - **{Status Comments}"),
+    (('Path to Green',), "**Path to Green - **{Path to Green}"),
+    (('Modified By', 'Modified'), "**Status Modified By - **{Modified By} at {Modified}"),
+    (('Orig Due Date',), "**Original Due Date - **{Orig Due Date}"),
+    (('Owners',), "**Owner(s) - **{Owners}"),
+]
+
+# Number of rendered entries held in memory before they are written out
+WRITE_BUFFER_ENTRIES = 1000
+
+# Rows rendered per task in parallel mode
+RENDER_CHUNK_ROWS = 5000
+
+class CompiledTemplate:
+    """Item template compiled once into positional format strings over a fixed column list."""
+
+    def __init__(self, template):
+        self.columns = []
+        self.lines = []
+        for required, line in template:
+            # Swap column names for positions so rendering is a plain str.format(*values)
+            compiled = ''
+            for literal, field, spec, conversion in string.Formatter().parse(line):
+                compiled += literal.replace('{', '{{').replace('}', '}}')
+                if field is not None:
+                    compiled += '{' + str(self._position(field)) + '}'
+            self.lines.append((tuple(self._position(column) for column in required), compiled))
+
+    def _position(self, column):
+        """Return the position of a column in the compiled column list, adding it if new."""
+        if column not in self.columns:
+            self.columns.append(column)
+        return self.columns.index(column)
+
+    def render(self, values, present):
+        """Render one item from its column values and their not-null flags."""
+        markdown = [line.format(*values) for required, line in self.lines
+                    if all(present[position] for position in required)]
+        markdown.append("")
+        return "\n".join(markdown)
+
+    def render_frame(self, df):
+        """Yield the rendered items for every row of a DataFrame, in order."""
+        values = [df[column].tolist() for column in self.columns]
+        present = [df[column].notna().tolist() for column in self.columns]
+        for row_values, row_present in zip(zip(*values), zip(*present)):
+            yield self.render(row_values, row_present)
+
+COMPILED_TEMPLATE = CompiledTemplate(ITEM_TEMPLATE)
+
+class BufferedMarkdownWriter:
+    """Write newline-separated markdown entries to a file in bounded chunks."""
+
+    def __init__(self, f, buffer_entries=WRITE_BUFFER_ENTRIES):
+        self.f = f
+        self.buffer_entries = buffer_entries
+        self.buffer = []
+        self.started = False
+
+    def add(self, entry):
+        """Queue one entry, flushing the buffer once it is full."""
+        if self.started:
+            self.buffer.append("\n")
+        self.buffer.append(entry)
+        self.started = True
+        if len(self.buffer) >= self.buffer_entries:
+            self.flush()
+
+    def flush(self):
+        """Write out any queued entries."""
+        self.f.write(''.join(self.buffer))
+        self.buffer = []
 
 def format_item(row):
     """Format a single item according to the specified markdown template."""
-    markdown = []
-    
-    # Header line
-    header = f"**[{row['Status']}] {row['Goal Set']} Goal [{row['ID']}] {row['Title']} on {row['Date']}**"
-    markdown.append(header)
-    
-    # Description
-    markdown.append(f"{row['Description']}")
-    
-    # Status Comments
-    if pd.notna(row['Status Comments']):
-        markdown.append(f"**Status Comments - **{row['Status Comments']}")
+    values = [row[column] for column in COMPILED_TEMPLATE.columns]
+    return COMPILED_TEMPLATE.render(values, [pd.notna(value) for value in values])
+
+# Goal set reported on when none is given
+DEFAULT_GOAL_SET = 'LT'
+
+def filter_batch(batch, cutoff, goal_set=DEFAULT_GOAL_SET):
+    """Keep the goals of one goal set in a batch that pass the inclusion criteria."""
+    batch = batch[batch['Goal Set'] == goal_set]
+    return batch[inclusion_mask(batch, cutoff)]
+
+def status_groups(df):
+    """Split items into status groups in display order, folding non-standard statuses into New."""
+    order = get_status_order()
+    labels = df['Status'].where(df['Status'].isin(order[:-1]), 'New')
+    groups = pd.Categorical(labels, categories=order, ordered=True)
+    return df.groupby(groups, observed=True, sort=True)
+
+def render_chunk(df):
+    """Render every row of a chunk, joined the way BufferedMarkdownWriter separates entries."""
+    return "\n".join(COMPILED_TEMPLATE.render_frame(df))
+
+def render_parallel(frames, workers, chunk_rows=RENDER_CHUNK_ROWS):
+    """Yield the rendered chunks of every frame, in order, rendered across a process pool.
+
+    Only the template's columns are sent to the workers, and at most two
+    chunks per worker are in flight, so memory stays bounded however many
+    rows there are.
+    """
+    chunks = (frame[COMPILED_TEMPLATE.columns].iloc[start:start + chunk_rows]
+              for frame in frames for start in range(0, len(frame), chunk_rows))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(render_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def write_sections(f, groups, workers=None, chunk_rows=RENDER_CHUNK_ROWS):
+    """Write (status, items) groups to an open file as markdown sections and return the items written.
+
+    With more than one worker, items are rendered in chunks across a process
+    pool and merged back in order; the output is the same as rendering serially.
+    """
+    writer = BufferedMarkdownWriter(f)
+    rows = 0
     
-    # Path to Green (only if not null)
-    if pd.notna(row['Path to Green']):
-        markdown.append(f"**Path to Green - **{row['Path to Green']}")
+    groups = [(status, status_group) for status, status_group in groups if len(status_group) > 0]
+    rendered = None
+    if workers and workers > 1:
+        rendered = render_parallel([status_group for _, status_group in groups], workers, chunk_rows)
     
-    # Modified By and Modified date
-    if pd.notna(row['Modified By']) and pd.notna(row['Modified']):
-        markdown.append(f"**Status Modified By - **{row['Modified By']} at {row['Modified']}")
+    # Process each status group in specified order
+    for status, status_group in groups:
+        # Add group header
+        display_status = status if status != 'New' else 'New'
+        writer.add(f"### {display_status} ({len(status_group)})\n")
+        
+        # Add items, taking this group's chunks from the pool in order
+        if rendered is None:
+            for item in COMPILED_TEMPLATE.render_frame(status_group):
+                writer.add(item)
+        else:
+            for _ in range(0, len(status_group), chunk_rows):
+                writer.add(next(rendered))
+        rows += len(status_group)
     
-    # Original Due Date
-    if pd.notna(row['Orig Due Date']):
-        markdown.append(f"**Original Due Date - **{row['Orig Due Date']}")
+    writer.flush()
+    return rows
+
+def write_markdown(input_file, output_file, chunk_size=DEFAULT_CHUNK_SIZE, cache_dir=None, profiler=None,
+                   input_format=None, goal_set=DEFAULT_GOAL_SET, workers=None):
+    """Write the markdown report for one goal set of a workbook, raising on failure.
+
+    workers above one renders the items in parallel; see write_sections.
+    """
+    if profiler is None:
+        profiler = Profiler()
     
-    # Owners
-    if pd.notna(row['Owners']):
-        markdown.append(f"**Owner(s) - **{row['Owners']}")
+    # Parsing counters are process-wide; report only this run's share of them
+    parse_start = parse_stats()['columns']
     
-    # Add empty line after item
-    markdown.append("")
+    with profiler.stage('total') as total:
+        # Use one cutoff for every item in the run
+        cutoff = get_cutoff()
+        
+        # Stream the Excel file in batches, keeping only the rows that will be rendered
+        filtered = []
+        batches = load_batches(input_file, chunk_size=chunk_size, cache_dir=cache_dir,
+                               input_format=input_format)
+        for batch in profiler.iterate('read', batches):
+            with profiler.stage('filter') as stage:
+                filtered.append(filter_batch(batch, cutoff, goal_set))
+                stage.rows += len(batch)
+            total.rows += len(batch)
+        df = pd.concat(filtered)
+        
+        # Stream markdown content to the file as each status group is rendered
+        with profiler.stage('render') as stage, open(output_file, 'w', encoding='utf-8') as f:
+            stage.rows += write_sections(f, status_groups(df), workers)
     
-    return "\n".join(markdown)
+    profiler.counters['date_parse'] = column_stats_since(parse_start)
 
-def generate_markdown(input_file, output_file):
+def generate_markdown(input_file, output_file, chunk_size=DEFAULT_CHUNK_SIZE, cache_dir=None, profile=None,
+                      input_format=None, workers=None):
     """Generate markdown file from Excel data."""
+    # Stage timings are emitted as JSON lines when profiling is on (--profile or EXCEL_PROFILE)
+    profiler = get_profiler(profile)
+    profiler.context = {'command': 'generate_markdown', 'input': input_file}
+    
     try:
-        # Read Excel file
-        df = pd.read_excel(input_file)
-        
-        # Filter for LT Goal Set
-        df = df[df['Goal Set'] == 'LT']
-        
-        # Initialize markdown content
-        markdown_content = []
-        
-        # Process each status group in specified order
-        for status in get_status_order():
-            if status == 'New':
-                # Group all non-standard statuses
-                status_group = df[~df['Status'].apply(is_standard_status)]
-            else:
-                status_group = df[df['Status'] == status]
-            
-            # Filter items based on criteria
-            status_group = status_group[status_group.apply(should_include_item, axis=1)]
-            
-            if len(status_group) > 0:
-                # Add group header
-                display_status = status if status != 'New' else 'New'
-                markdown_content.append(f"### {display_status} ({len(status_group)})\n")
-                
-                # Add items
-                for _, row in status_group.iterrows():
-                    markdown_content.append(format_item(row))
-        
-        # Write to file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(markdown_content))
+        write_markdown(input_file, output_file, chunk_size, cache_dir, profiler, input_format, workers=workers)
         
         print(f"Successfully generated markdown file: {output_file}")
         
     except Exception as e:
         print(f"Error generating markdown: {str(e)}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        profiler.report()
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python generate_markdown.py <input_excel_file> <output_markdown_file>")
+    args, profile = pop_profile_flag(sys.argv[1:])
+    if len(args) != 2:
+        print("Usage: python generate_markdown.py [--profile] <input_excel_file> <output_markdown_file>")
         sys.exit(1)
     
     
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
-    generate_markdown(input_file, output_file)
+    input_file = args[0]
+    output_file = args[1]
+    generate_markdown(input_file, output_file, profile=profile or None)
@@ -1,58 +1,142 @@
+import argparse
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from excel_processor import REQUIRED_COLUMNS
+from excel_writer import StreamingExcelWriter
 
-# Get current date and dates for testing
-now = datetime.now()
-two_weeks_ago = now - timedelta(weeks=2)
-four_weeks_ago = now - timedelta(weeks=4)
-
-# Create test DataFrame with meaningful data for pivot table and markdown analysis
-df = pd.DataFrame({
-    'Type': ['Project'] * 15,
-    'Status': ['Completed', 'Red', 'Yellow', 'Green',  # Standard statuses
-               'In Progress', 'On Hold', 'Blocked',  # Non-standard statuses
-               'Red', 'Yellow', 'Green', 'Completed',
-               'Pending Review', 'Not Started',  # More non-standard statuses
-               'Red', 'Yellow'],
-    'Title': [f'Sample Goal {i}' for i in range(1, 16)],
-    'Description': [f'Description for goal {i}' for i in range(1, 16)],
-    'Date': [now.strftime('%Y-%m-%d')] * 15,
-    'Modified': [
-        # Recent modifications (within 3 weeks)
-        now.strftime('%Y-%m-%d'),           # Completed
-        now.strftime('%Y-%m-%d'),           # Completed Late
-        two_weeks_ago.strftime('%Y-%m-%d'), # DNM
-        two_weeks_ago.strftime('%Y-%m-%d'), # Cancelled
-        now.strftime('%Y-%m-%d'),           # Red
-        now.strftime('%Y-%m-%d'),           # Yellow
-        now.strftime('%Y-%m-%d'),           # Green
-        # Old modifications (over 3 weeks ago)
-        four_weeks_ago.strftime('%Y-%m-%d'), # Completed
-        four_weeks_ago.strftime('%Y-%m-%d'), # Completed Late
-        four_weeks_ago.strftime('%Y-%m-%d'), # DNM
-        four_weeks_ago.strftime('%Y-%m-%d'), # Cancelled
-        now.strftime('%Y-%m-%d'),            # Red
-        now.strftime('%Y-%m-%d'),            # Yellow
-        now.strftime('%Y-%m-%d'),            # Green
-        now.strftime('%Y-%m-%d'),            # Green
-    ],
-    'Created': [
-        now.strftime('%Y-%m-%d')] * 13 + [
-        two_weeks_ago.strftime('%Y-%m-%d'),  # Green (recent)
-        four_weeks_ago.strftime('%Y-%m-%d'), # Green (old)
-    ],
-    'Team': ['Team A', 'Team B', 'Team A', 'Team B', 'Team A',
-             'Team B', 'Team A', 'Team B', 'Team A', 'Team B',
-             'Team A', 'Team B', 'Team A', 'Team B', 'Team A'],
-    'Goal Set': ['LT'] * 15,
-    'ID': [f'ID_{i:03d}' for i in range(1, 16)],
-    'Status Comments': [f'Latest status update for goal {i}' for i in range(1, 16)],
-    'Path to Green': [f'Path to green for goal {i}' if i % 2 == 0 else None for i in range(1, 16)],
-    'Modified By': ['User A', 'User B'] * 7 + ['User A'],
-    'Orig Due Date': [(now + timedelta(days=30)).strftime('%Y-%m-%d')] * 15,
-    'Owners': ['Owner A, Owner B'] * 15
-})
-
-# Save to Excel file
-df.to_excel('test_input.xlsx', index=False)
-print("Test input file 'test_input.xlsx' has been created successfully.")
+STANDARD_STATUSES = ['Completed', 'Completed Late', 'DNM', 'Cancelled', 'Red', 'Yellow', 'Green']
+
+# Columns filled with dates; everything else gets text
+DATE_COLUMNS = ['Date', 'Modified', 'Created', 'Orig Due Date', 'Start Date', 'Need By Date', 'Completion Date']
+
+# Rows generated and written at a time so large files never sit in memory whole
+GENERATE_CHUNK_ROWS = 50000
+
+def build_sample_frame() -> pd.DataFrame:
+    """Build the small fixed dataset used for checking pivot tables and markdown by hand."""
+    # Get current date and dates for testing
+    now = datetime.now()
+    two_weeks_ago = now - timedelta(weeks=2)
+    four_weeks_ago = now - timedelta(weeks=4)
+
+    # Create test DataFrame with meaningful data for pivot table and markdown analysis
+    return pd.DataFrame({
+        'Type': ['Project'] * 15,
+        'Status': ['Completed', 'Red', 'Yellow', 'Green',  # Standard statuses
+                   'In Progress', 'On Hold', 'Blocked',  # Non-standard statuses
+                   'Red', 'Yellow', 'Green', 'Completed',
+                   'Pending Review', 'Not Started',  # More non-standard statuses
+                   'Red', 'Yellow'],
+        'Title': [f'Sample Goal {i}' for i in range(1, 16)],
+        'Description': [f'Description for goal {i}' for i in range(1, 16)],
+        'Date': [now.strftime('%Y-%m-%d')] * 15,
+        'Modified': [
+            # Recent modifications (within 3 weeks)
+            now.strftime('%Y-%m-%d'),           # Completed
+            now.strftime('%Y-%m-%d'),           # Completed Late
+            two_weeks_ago.strftime('%Y-%m-%d'), # DNM
+            two_weeks_ago.strftime('%Y-%m-%d'), # Cancelled
+            now.strftime('%Y-%m-%d'),           # Red
+            now.strftime('%Y-%m-%d'),           # Yellow
+            now.strftime('%Y-%m-%d'),           # Green
+            # Old modifications (over 3 weeks ago)
+            four_weeks_ago.strftime('%Y-%m-%d'), # Completed
+            four_weeks_ago.strftime('%Y-%m-%d'), # Completed Late
+            four_weeks_ago.strftime('%Y-%m-%d'), # DNM
+            four_weeks_ago.strftime('%Y-%m-%d'), # Cancelled
+            now.strftime('%Y-%m-%d'),            # Red
+            now.strftime('%Y-%m-%d'),            # Yellow
+            now.strftime('%Y-%m-%d'),            # Green
+            now.strftime('%Y-%m-%d'),            # Green
+        ],
+        'Created': [
+            now.strftime('%Y-%m-%d')] * 13 + [
+            two_weeks_ago.strftime('%Y-%m-%d'),  # Green (recent)
+            four_weeks_ago.strftime('%Y-%m-%d'), # Green (old)
+        ],
+        'Team': ['Team A', 'Team B', 'Team A', 'Team B', 'Team A',
+                 'Team B', 'Team A', 'Team B', 'Team A', 'Team B',
+                 'Team A', 'Team B', 'Team A', 'Team B', 'Team A'],
+        'Goal Set': ['LT'] * 15,
+        'ID': [f'ID_{i:03d}' for i in range(1, 16)],
+        'Status Comments': [f'Latest status update for goal {i}' for i in range(1, 16)],
+        'Path to Green': [f'Path to green for goal {i}' if i % 2 == 0 else None for i in range(1, 16)],
+        'Modified By': ['User A', 'User B'] * 7 + ['User A'],
+        'Orig Due Date': [(now + timedelta(days=30)).strftime('%Y-%m-%d')] * 15,
+        'Owners': ['Owner A, Owner B'] * 15
+    })
+
+def build_synthetic_frame(rows: int, start: int = 0, teams: int = 10, statuses: int = 10,
+                          goal_sets: int = 3, years: int = 2, null_ratio: float = 0.1,
+                          seed: int = 0) -> pd.DataFrame:
+    """Build rows start..start+rows of a reproducible synthetic export with the full required schema.
+
+    teams, statuses and goal_sets set the cardinality of those columns (the
+    first statuses are the standard ones, the rest custom), dates are spread
+    over the given number of years ending a quarter from now, and null_ratio
+    is the share of optional cells left empty.
+    """
+    # Seed per chunk so any slice of the dataset can be regenerated on its own
+    rng = np.random.default_rng([seed, start])
+    ids = np.arange(start, start + rows)
+
+    status_values = STANDARD_STATUSES[:statuses] + [f'Custom Status {k}' for k in range(max(0, statuses - len(STANDARD_STATUSES)))]
+    goal_set_values = ['LT'] + [f'Goal Set {k}' for k in range(1, goal_sets)]
+    team_values = [f'Team {k}' for k in range(teams)]
+
+    df = pd.DataFrame({
+        'ID': pd.Series(ids).map('G-{:07d}'.format),
+        'Team': pd.Categorical.from_codes(rng.integers(0, teams, rows), team_values),
+        'Status': pd.Categorical.from_codes(rng.integers(0, len(status_values), rows), status_values),
+        'Goal Set': pd.Categorical.from_codes(rng.integers(0, goal_sets, rows), goal_set_values),
+    })
+
+    # Dates are drawn from a window ending one quarter ahead, as strings like real exports
+    newest = pd.Timestamp(datetime.now().date()) + pd.Timedelta(days=90)
+    span_days = 365 * years
+    for column in DATE_COLUMNS:
+        offsets = pd.to_timedelta(rng.integers(0, span_days, rows), unit='D')
+        df[column] = (newest - offsets).strftime('%Y-%m-%d')
+
+    for column in REQUIRED_COLUMNS:
+        if column not in df.columns:
+            df[column] = column + ' ' + pd.Series(ids % 1000).astype(str)
+
+    # Blank out optional cells; identifying and grouping columns always keep a value
+    always_present = ['ID', 'Team', 'Status', 'Goal Set', 'Title', 'Date']
+    for column in REQUIRED_COLUMNS:
+        if column not in always_present:
+            df[column] = df[column].astype(object).where(rng.random(rows) >= null_ratio, None)
+
+    df.index = pd.RangeIndex(start, start + rows)
+    return df[REQUIRED_COLUMNS]
+
+def write_synthetic_workbook(output_file: str, rows: int, **options) -> None:
+    """Write a synthetic export to an Excel file in chunks."""
+    with StreamingExcelWriter(output_file) as writer:
+        for start in range(0, max(rows, 1), GENERATE_CHUNK_ROWS):
+            count = min(GENERATE_CHUNK_ROWS, rows - start)
+            writer.write_frame('Sheet1', build_synthetic_frame(count, start, **options))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate test input workbooks.")
+    parser.add_argument('--rows', type=int,
+                        help="number of synthetic rows; omit for the fixed 15-row sample")
+    parser.add_argument('--output', default='test_input.xlsx', help="output workbook path")
+    parser.add_argument('--teams', type=int, default=10, help="number of distinct teams")
+    parser.add_argument('--statuses', type=int, default=10, help="number of distinct statuses")
+    parser.add_argument('--goal-sets', type=int, default=3, help="number of distinct goal sets")
+    parser.add_argument('--years', type=int, default=2, help="years of history to spread dates over")
+    parser.add_argument('--null-ratio', type=float, default=0.1, help="share of optional cells left empty")
+    parser.add_argument('--seed', type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    if args.rows is None:
+        # Save to Excel file
+        build_sample_frame().to_excel(args.output, index=False)
+    else:
+        write_synthetic_workbook(args.output, args.rows, teams=args.teams, statuses=args.statuses,
+                                 goal_sets=args.goal_sets, years=args.years,
+                                 null_ratio=args.null_ratio, seed=args.seed)
+    print(f"Test input file '{args.output}' has been created successfully.")
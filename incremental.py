@@ -0,0 +1,230 @@
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from date_utils import now
+from excel_processor import REQUIRED_COLUMNS, ensure_columns, write_pivot_sheets
+from excel_reader import DEFAULT_CHUNK_SIZE
+from generate_markdown import COMPILED_TEMPLATE, filter_batch, get_cutoff, status_groups
+from pivot_cube import PivotCube
+from table_io import open_writer
+from workbook_cache import load_batches
+
+# Bump when the state layout or row hashing changes so old state files are ignored
+STATE_VERSION = 2
+
+def load_state(state_file: Optional[str], kind: str) -> Optional[Dict]:
+    """Load a previous run's state, or None when it is missing or from an incompatible run."""
+    if not state_file or not os.path.exists(state_file):
+        return None
+    with open(state_file, 'rb') as f:
+        state = pickle.load(f)
+    if state.get('version') != STATE_VERSION or state.get('kind') != kind:
+        return None
+    return state
+
+def save_state(state_file: str, state: Dict) -> None:
+    """Atomically replace the state file."""
+    temp_path = f"{state_file}.tmp"
+    with open(temp_path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, state_file)
+
+def canonical_column(column: pd.Series) -> pd.Series:
+    """Give a column the dtype it would have whatever batch it was read in.
+
+    Integer cells come back as float when their batch also has blanks, and
+    date cells as datetime64 when their batch has nothing else, so numbers
+    are mapped to one integer type and dates and mixed cells to their text.
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        categories = canonical_column(pd.Series(column.cat.categories))
+        return column.cat.rename_categories(pd.Index(categories))
+    if pd.api.types.is_float_dtype(column.dtype):
+        values = column.dropna()
+        if (values == values.round()).all():
+            return column.astype('Int64')
+    elif pd.api.types.is_integer_dtype(column.dtype) or pd.api.types.is_bool_dtype(column.dtype):
+        return column.astype('Int64')
+    elif pd.api.types.is_datetime64_dtype(column.dtype) or column.dtype == object:
+        return column.astype(object).astype(str).where(column.notna())
+    return column
+
+def row_hashes(df: pd.DataFrame) -> List[int]:
+    """Hash every row's values; equal rows hash equally across runs and batch boundaries."""
+    canonical = pd.DataFrame({column: canonical_column(df[column]) for column in df.columns}, copy=False)
+    return pd.util.hash_pandas_object(canonical, index=False).tolist()
+
+def row_ids(ids: pd.Series, seen: Counter) -> List[Tuple]:
+    """Identify rows by ID plus occurrence number, so duplicate IDs are tracked separately.
+
+    seen carries the occurrence counts across batches and is updated in place.
+    """
+    occurrence = ids.groupby(ids, sort=False).cumcount() + ids.map(seen).fillna(0).astype(int)
+    seen.update(ids.value_counts().to_dict())
+    return list(zip(ids.tolist(), occurrence.tolist()))
+
+def process_file_incremental(input_file: str, output_file: str, state_file: str,
+                             chunk_size: int = DEFAULT_CHUNK_SIZE,
+                             engine: Optional[str] = None,
+                             cache_dir: Optional[str] = None) -> Dict[str, int]:
+    """Write the Data and pivot sheets, updating the pivot cube only for changed rows.
+
+    The state file holds each ID's row hash and cube key from the previous
+    run together with the cube counts. Rows whose hash is unchanged are left
+    out of the aggregation, while inserted, updated and deleted rows adjust
+    the stored counts. The state is rebuilt from scratch when it is missing
+    or was made against a different reference year, since every Quarter label
+    can change then.
+    """
+    reference_year = now().year
+    state = load_state(state_file, 'process')
+    if state is not None and state['reference_year'] != reference_year:
+        state = None
+
+    previous_rows = state['rows'] if state else {}
+    cube_keys = state['cube_keys'] if state else []
+    counts = dict(state['counts']) if state else {}
+    key_index = {key: index for index, key in enumerate(cube_keys)}
+
+    def adjust(index: int, delta: int) -> None:
+        key = cube_keys[index]
+        counts[key] = counts.get(key, 0) + delta
+        if counts[key] == 0:
+            del counts[key]
+
+    rows = {}
+    seen = Counter()
+    summary = {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+
+    # Rows without an ID can't be matched between runs, so they are counted afresh each time
+    untracked = PivotCube()
+
+    with open_writer(output_file, engine=engine) as writer:
+        for batch in load_batches(input_file, chunk_size=chunk_size, cache_dir=cache_dir):
+            batch = ensure_columns(batch, REQUIRED_COLUMNS, reference_year=reference_year)
+            writer.write_frame('Data', batch)
+
+            has_id = batch['ID'].notna()
+            untracked.update(batch[~has_id])
+            tracked = batch[has_id]
+
+            changed = []
+            for position, (row_id, row_hash) in enumerate(zip(row_ids(tracked['ID'], seen), row_hashes(tracked))):
+                previous = previous_rows.pop(row_id, None)
+                if previous is not None and previous[0] == row_hash:
+                    rows[row_id] = previous
+                    summary['unchanged'] += 1
+                    continue
+                if previous is not None:
+                    adjust(previous[1], -1)
+                    summary['updated'] += 1
+                else:
+                    summary['inserted'] += 1
+                changed.append((position, row_id, row_hash))
+
+            # Only changed rows need their cube keys worked out
+            new_keys = untracked.row_keys(tracked.iloc[[position for position, _, _ in changed]])
+            for (position, row_id, row_hash), key in zip(changed, new_keys):
+                if key not in key_index:
+                    key_index[key] = len(cube_keys)
+                    cube_keys.append(key)
+                adjust(key_index[key], 1)
+                rows[row_id] = (row_hash, key_index[key])
+
+        # Whatever was not seen this time has been deleted
+        for row_hash, index in previous_rows.values():
+            adjust(index, -1)
+            summary['deleted'] += 1
+
+        cube = PivotCube()
+        cube.counts = dict(counts)
+        cube.merge(untracked)
+        write_pivot_sheets(writer, cube)
+
+    save_state(state_file, {
+        'version': STATE_VERSION,
+        'kind': 'process',
+        'reference_year': reference_year,
+        'rows': rows,
+        'cube_keys': cube_keys,
+        'counts': counts,
+    })
+    return summary
+
+def section_signature(section: pd.DataFrame) -> str:
+    """Digest of everything a rendered status section depends on."""
+    return hashlib.sha256(repr(row_hashes(section[COMPILED_TEMPLATE.columns])).encode()).hexdigest()
+
+def generate_markdown_incremental(input_file: str, output_file: str, state_file: str,
+                                  chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                  cache_dir: Optional[str] = None) -> Dict[str, int]:
+    """Generate the markdown file, re-rendering only status sections whose items changed.
+
+    The inclusion filter runs over every row each time, since items also age
+    out of the reporting window without being modified. Each section's items
+    are then hashed and compared with the previous run, whose rendered text
+    is reused for every section that matches.
+    """
+    state = load_state(state_file, 'markdown')
+    previous_sections = state['sections'] if state else {}
+
+    cutoff = get_cutoff()
+    batches = load_batches(input_file, chunk_size=chunk_size, cache_dir=cache_dir)
+    df = pd.concat([filter_batch(batch, cutoff) for batch in batches])
+
+    sections = {}
+    summary = {'rendered': 0, 'reused': 0}
+    for status, status_group in status_groups(df):
+        if len(status_group) == 0:
+            continue
+
+        signature = section_signature(status_group)
+        previous = previous_sections.get(status)
+        if previous is not None and previous[0] == signature:
+            sections[status] = previous
+            summary['reused'] += 1
+            continue
+
+        # Add group header followed by the items, as generate_markdown lays them out
+        entries = [f"### {status} ({len(status_group)})\n"]
+        entries.extend(COMPILED_TEMPLATE.render_frame(status_group))
+        sections[status] = (signature, '\n'.join(entries))
+        summary['rendered'] += 1
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(text for _, text in sections.values()))
+
+    save_state(state_file, {'version': STATE_VERSION, 'kind': 'markdown', 'sections': sections})
+    return summary
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the incremental command line and return the process exit code."""
+    parser = argparse.ArgumentParser(description="Reprocess an export, recomputing only what changed since the last run.")
+    parser.add_argument('command', choices=['process', 'markdown'], help="output to produce")
+    parser.add_argument('input_file')
+    parser.add_argument('output_file')
+    parser.add_argument('--state', required=True, help="state file kept between runs")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'process':
+            summary = process_file_incremental(args.input_file, args.output_file, args.state)
+            print(f"Applied {summary['inserted']} inserted, {summary['updated']} updated and "
+                  f"{summary['deleted']} deleted rows ({summary['unchanged']} unchanged). "
+                  f"Output saved to: {args.output_file}")
+        else:
+            summary = generate_markdown_incremental(args.input_file, args.output_file, args.state)
+            print(f"Rendered {summary['rendered']} status sections, reused {summary['reused']}. "
+                  f"Output saved to: {args.output_file}")
+    except Exception as e:
+        print(f"Error during incremental run: {str(e)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+import os
+import pickle
+import shutil
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import pandas as pd
+from excel_writer import StreamingExcelWriter
+
+# Rows a worksheet can hold, header included
+EXCEL_MAX_ROWS = 1048576
+
+# Data rows per shard by default: a full worksheet less its header row
+DEFAULT_SHARD_ROWS = EXCEL_MAX_ROWS - 1
+
+DATA_SHEET = 'Data'
+
+def shard_sheet_name(shard: int, sheet_name: str = DATA_SHEET) -> str:
+    """Name the sheet holding a shard of the Data sheet: Data, Data 2, Data 3, ..."""
+    return sheet_name if shard == 0 else f"{sheet_name} {shard + 1}"
+
+def shard_file_name(output_file: str, shard: int) -> str:
+    """Name the workbook holding a shard in file mode: out.xlsx, out_2.xlsx, out_3.xlsx, ..."""
+    if shard == 0:
+        return output_file
+    stem, extension = os.path.splitext(output_file)
+    return f"{stem}_{shard + 1}{extension}"
+
+def check_shard_rows(shard_rows: Optional[int]) -> int:
+    """Resolve the row cap per shard, rejecting caps a worksheet can't hold."""
+    if shard_rows is None:
+        return DEFAULT_SHARD_ROWS
+    if not 1 <= shard_rows <= DEFAULT_SHARD_ROWS:
+        raise ValueError(f"Rows per shard must be between 1 and {DEFAULT_SHARD_ROWS}, got {shard_rows}")
+    return shard_rows
+
+class _DataSharder:
+    """Splits the rows written to the Data sheet into shards of at most shard_rows rows.
+
+    Subclasses decide where a shard's rows go; every other sheet is handed
+    to _write_other unchanged.
+    """
+
+    def __init__(self, shard_rows: Optional[int] = None, sheet_name: str = DATA_SHEET):
+        self.shard_rows = check_shard_rows(shard_rows)
+        self.sheet_name = sheet_name
+        self.shard = 0
+        self.rows = 0
+
+    def write_frame(self, sheet_name: str, df: pd.DataFrame) -> None:
+        """Append a DataFrame to a sheet, starting a new shard whenever the Data sheet is full."""
+        if sheet_name != self.sheet_name:
+            self._write_other(sheet_name, df)
+            return
+
+        while True:
+            if self.rows == self.shard_rows and len(df):
+                self.shard += 1
+                self.rows = 0
+                self._start_shard()
+            piece = df.iloc[:self.shard_rows - self.rows]
+            self._write_shard(piece)
+            self.rows += len(piece)
+            df = df.iloc[len(piece):]
+            if not len(df):
+                return
+
+    def shards(self) -> int:
+        """Return how many shards the Data sheet has been split into so far."""
+        return self.shard + 1
+
+    def _start_shard(self) -> None:
+        """Prepare for rows of the shard just started."""
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+    def discard(self) -> None:
+        raise NotImplementedError
+
+    def _write_shard(self, df: pd.DataFrame) -> None:
+        raise NotImplementedError
+
+    def _write_other(self, sheet_name: str, df: pd.DataFrame) -> None:
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+class ShardedSheetWriter(_DataSharder):
+    """Wraps a workbook writer so the Data sheet continues on Data 2, Data 3, ... once it is full.
+
+    Below the cap the workbook is exactly what the wrapped writer would
+    produce on its own.
+    """
+
+    def __init__(self, writer, shard_rows: Optional[int] = None, sheet_name: str = DATA_SHEET):
+        super().__init__(shard_rows, sheet_name)
+        self.writer = writer
+
+    def _write_shard(self, df: pd.DataFrame) -> None:
+        self.writer.write_frame(shard_sheet_name(self.shard, self.sheet_name), df)
+
+    def _write_other(self, sheet_name: str, df: pd.DataFrame) -> None:
+        self.writer.write_frame(sheet_name, df)
+
+    def set_auto_filter(self, sheet_name: str) -> None:
+        """Apply an auto-filter over a sheet, or over every shard of the Data sheet."""
+        if sheet_name != self.sheet_name:
+            self.writer.set_auto_filter(sheet_name)
+            return
+        for shard in range(self.shards()):
+            self.writer.set_auto_filter(shard_sheet_name(shard, self.sheet_name))
+
+    def close(self) -> None:
+        """Finish the workbook and save it to the output file."""
+        self.writer.close()
+
+    def discard(self) -> None:
+        """Abandon the workbook without saving it."""
+        self.writer.discard()
+
+def _remove_files(paths: List[str]) -> None:
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+def write_shard(spill_file: str, output_file: str, sheet_name: str = DATA_SHEET,
+                engine: Optional[str] = None, operations: Optional[List[Tuple]] = None) -> str:
+    """Serialize one shard's spilled rows into its own workbook, then replay any other sheet operations.
+
+    Runs in a pool worker; operations are ('write', sheet, frame) and
+    ('filter', sheet) tuples in the order they were issued.
+    """
+    # Imported here since workbook_cache depends on this module through table_io
+    from workbook_cache import _read_batches
+
+    with StreamingExcelWriter(output_file, engine) as writer:
+        for batch in _read_batches(spill_file):
+            writer.write_frame(sheet_name, batch)
+        for operation in operations or []:
+            if operation[0] == 'write':
+                writer.write_frame(operation[1], operation[2])
+            else:
+                writer.set_auto_filter(operation[1])
+    return output_file
+
+class ShardedFileWriter(_DataSharder):
+    """Shards the Data sheet across workbooks that are serialized concurrently in a process pool.
+
+    Normalized rows are pickled to a spill file per shard, which is much
+    cheaper than building worksheet XML, and each full shard is handed to a
+    worker that writes it as out_2.xlsx, out_3.xlsx, ... while later rows are
+    still being read. The first shard goes to the output file itself together
+    with every other sheet, such as the pivots, once the writer is closed.
+    """
+
+    def __init__(self, output_file: str, shard_rows: Optional[int] = None,
+                 engine: Optional[str] = None, workers: Optional[int] = None,
+                 sheet_name: str = DATA_SHEET):
+        super().__init__(shard_rows, sheet_name)
+        self.output_file = output_file
+        self.engine = engine
+        self.operations: List[Tuple] = []
+        self.futures: List[Future] = []
+        self.spill_dir = tempfile.mkdtemp(prefix='shards-')
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.spill = open(self._spill_path(0), 'wb')
+
+    def _spill_path(self, shard: int) -> str:
+        return os.path.join(self.spill_dir, f"{shard}.pkl")
+
+    def _start_shard(self) -> None:
+        # The previous shard is complete, so it can be serialized while reading goes on
+        self.spill.close()
+        self._submit(self.shard - 1)
+        self.spill = open(self._spill_path(self.shard), 'wb')
+
+    def _submit(self, shard: int, operations: Optional[List[Tuple]] = None) -> None:
+        """Queue a spilled shard for serialization; the first shard waits for the other sheets."""
+        if shard == 0 and operations is None:
+            return
+        self.futures.append(self.executor.submit(write_shard, self._spill_path(shard),
+                                                 shard_file_name(self.output_file, shard),
+                                                 self.sheet_name, self.engine, operations))
+
+    def _write_shard(self, df: pd.DataFrame) -> None:
+        pickle.dump(df, self.spill, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _write_other(self, sheet_name: str, df: pd.DataFrame) -> None:
+        self.operations.append(('write', sheet_name, df))
+
+    def set_auto_filter(self, sheet_name: str) -> None:
+        """Apply an auto-filter over a sheet once it is written; each Data shard is a sheet of its own workbook."""
+        if sheet_name == self.sheet_name:
+            raise ValueError("Auto-filters on sharded Data workbooks are not supported")
+        self.operations.append(('filter', sheet_name))
+
+    def files(self) -> List[str]:
+        """Return every workbook written, the output file first."""
+        return [shard_file_name(self.output_file, shard) for shard in range(self.shards())]
+
+    def close(self) -> None:
+        """Serialize the remaining shards and wait for every workbook to be saved."""
+        try:
+            self.spill.close()
+            if self.shard > 0:
+                self._submit(self.shard)
+            self._submit(0, self.operations)
+            for future in self.futures:
+                future.result()
+            self._remove_stale_shards()
+        except BaseException:
+            # A shard that failed makes the whole set unusable, the output file included
+            self.discard()
+            _remove_files(self.files()[:1])
+            raise
+        finally:
+            self.executor.shutdown()
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def _remove_stale_shards(self) -> None:
+        """Remove shard workbooks past the last one, left by an earlier run with more rows."""
+        shard = self.shards()
+        while os.path.exists(shard_file_name(self.output_file, shard)):
+            os.remove(shard_file_name(self.output_file, shard))
+            shard += 1
+
+    def discard(self) -> None:
+        """Stop serializing shards and remove every shard workbook already written."""
+        try:
+            self.spill.close()
+            for future in self.futures:
+                future.cancel()
+            self.executor.shutdown(wait=True)
+        finally:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            _remove_files(self.files()[1:])
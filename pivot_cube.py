@@ -0,0 +1,107 @@
+import numbers
+import pandas as pd
+from typing import Dict, List, Optional
+
+CUBE_KEYS = ['Goal Set', 'Team', 'Status', 'Quarter']
+
+def normalize_key(value):
+    """Map every flavour of missing value to None so cube keys compare and hash cleanly."""
+    return None if pd.isna(value) else value
+
+def _mixed_sort_key(value) -> tuple:
+    """Order numbers before other values and text last, as pandas does for keys it can't compare."""
+    if isinstance(value, numbers.Number):
+        return (0, '', value)
+    if isinstance(value, str):
+        return (2, '', value)
+    return (1, type(value).__name__, value)
+
+def sort_table(table: pd.DataFrame) -> pd.DataFrame:
+    """Sort a table's rows and columns by key, even where a key column mixes numbers and text."""
+    try:
+        return table.sort_index().sort_index(axis=1)
+    except TypeError:
+        key = lambda index: pd.Index([_mixed_sort_key(value) for value in index], dtype=object, tupleize_cols=False)
+        return table.sort_index(key=key).sort_index(axis=1, key=key)
+
+class PivotCube:
+    """Count of ID accumulated by (Goal Set, Team, Status, Quarter).
+
+    Batches are added with update() and partial cubes from other workers with
+    merge(). Pivot tables are produced as roll-ups of the cube by pivot(), so
+    the underlying data only ever needs to be scanned once.
+    """
+
+    def __init__(self, keys: Optional[List[str]] = None, value: str = 'ID'):
+        self.keys = list(keys) if keys is not None else list(CUBE_KEYS)
+        self.value = value
+        self.counts: Dict[tuple, int] = {}
+
+    def update(self, df: pd.DataFrame) -> 'PivotCube':
+        """Add the counts from a batch of rows to the cube."""
+        if len(df) == 0:
+            return self
+
+        # Groups with only missing IDs are kept with a count of 0, as pd.pivot_table does
+        partial = df.groupby(self.keys, dropna=False, observed=True, sort=False)[self.value].count()
+        for key, count in partial.items():
+            key = tuple(normalize_key(part) for part in key)
+            self.counts[key] = self.counts.get(key, 0) + int(count)
+        return self
+
+    def row_keys(self, df: pd.DataFrame) -> List[tuple]:
+        """Return the normalized cube key of every row in a batch, in order."""
+        return [tuple(normalize_key(part) for part in key)
+                for key in df[self.keys].itertuples(index=False, name=None)]
+
+    def merge(self, other: 'PivotCube') -> 'PivotCube':
+        """Fold the counts from another cube with the same keys into this one."""
+        if other.keys != self.keys or other.value != self.value:
+            raise ValueError("Cannot merge cubes built over different keys or values")
+
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        return self
+
+    def fill_missing_keys(self, column: str, value) -> 'PivotCube':
+        """Relabel missing values of one key column, combining counts that become the same key."""
+        position = self.keys.index(column)
+        counts, self.counts = self.counts, {}
+        for key, count in counts.items():
+            if key[position] is None:
+                key = key[:position] + (value,) + key[position + 1:]
+            self.counts[key] = self.counts.get(key, 0) + count
+        return self
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the cube as one row per key combination with a count column."""
+        frame = pd.DataFrame(list(self.counts.keys()), columns=self.keys, dtype=object)
+        frame['count'] = pd.Series(list(self.counts.values()), dtype='int64')
+        return frame
+
+    def pivot(self, index: List[str], columns: str, filters: Optional[Dict] = None,
+              margins_name: str = 'Total') -> pd.DataFrame:
+        """Roll the cube up into a pivot table with row and column margins.
+
+        The result matches pd.pivot_table(values=self.value, index=index,
+        columns=columns, aggfunc='count', fill_value=0, margins=True) over the
+        rows the cube has seen, with index levels still set.
+        """
+        frame = self.to_frame()
+
+        # Optional filters select a slice of the cube, e.g. {'Goal Set': 'LT'}
+        for key, value in (filters or {}).items():
+            frame = frame[frame[key] == value]
+
+        # Rows missing any of the pivot keys are left out, as with dropna=True
+        frame = frame.dropna(subset=index + [columns])
+
+        table = frame.groupby(index + [columns])['count'].sum().unstack(columns, fill_value=0)
+        table = sort_table(table)
+
+        # Column margin is the row sum, row margin the column sums
+        table[margins_name] = table.sum(axis=1)
+        margin_key = margins_name if len(index) == 1 else (margins_name,) + ('',) * (len(index) - 1)
+        table.loc[margin_key, :] = table.sum(axis=0)
+
+        return table.astype('int64')
@@ -0,0 +1,266 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from pivot_cube import normalize_key, sort_table
+
+# Aggregations a pivot can use; every one rolls up from per-group partial statistics
+AGGFUNCS = ['count', 'size', 'sum', 'min', 'max', 'mean']
+NUMERIC_AGGFUNCS = {'sum', 'min', 'max', 'mean'}
+
+# Partial statistics kept per group and how partials for the same group combine
+STAT_ROLLUPS = {'count': 'sum', 'size': 'sum', 'numbers': 'sum', 'sum': 'sum', 'min': 'min', 'max': 'max'}
+_COMBINE = {'sum': lambda a, b: a + b, 'min': np.fmin, 'max': np.fmax}
+
+SPEC_FIELDS = {'sheet', 'rows', 'columns', 'values', 'aggfunc', 'filters',
+               'margins', 'margins_name', 'fill_value', 'blank_columns'}
+
+class PivotSpec:
+    """One pivot sheet: rows x columns over a value column, aggregated and optionally filtered.
+
+    filters maps a column to the value, or list of values, rows must have.
+    Numeric aggregations treat values that aren't numbers as missing.
+    blank_columns are empty columns put before the rows, e.g. to filter on.
+    fill_value fills cells without rows; it defaults to 0 for count and
+    size and is left missing for the other aggregations, as pd.pivot_table does.
+    """
+
+    def __init__(self, sheet: str, rows: List[str], columns: str, values: str = 'ID',
+                 aggfunc: str = 'count', filters: Optional[Dict] = None, margins: bool = True,
+                 margins_name: str = 'Total', fill_value=None, blank_columns: Optional[List[str]] = None):
+        if aggfunc not in AGGFUNCS:
+            raise ValueError(f"Pivot '{sheet}' has unknown aggfunc '{aggfunc}', expected one of: {', '.join(AGGFUNCS)}")
+        if not rows:
+            raise ValueError(f"Pivot '{sheet}' needs at least one row column")
+        self.sheet = sheet
+        self.rows = [rows] if isinstance(rows, str) else list(rows)
+        self.columns = columns
+        self.values = values
+        self.aggfunc = aggfunc
+        self.filters = dict(filters or {})
+        self.margins = margins
+        self.margins_name = margins_name
+        if fill_value is None and aggfunc in ('count', 'size'):
+            fill_value = 0
+        self.fill_value = fill_value
+        self.blank_columns = list(blank_columns or [])
+
+    @classmethod
+    def from_dict(cls, spec: Dict) -> 'PivotSpec':
+        """Build a spec from one entry of a spec file."""
+        unknown = set(spec) - SPEC_FIELDS
+        if unknown:
+            raise ValueError(f"Pivot '{spec.get('sheet')}' has unknown fields: {', '.join(sorted(unknown))}")
+        missing = {'sheet', 'rows', 'columns'} - set(spec)
+        if missing:
+            raise ValueError(f"Pivot '{spec.get('sheet')}' is missing: {', '.join(sorted(missing))}")
+        return cls(**spec)
+
+    def keys(self) -> List[str]:
+        """Return the columns the pivot groups by: rows, columns, then filtered columns."""
+        return list(dict.fromkeys(self.rows + [self.columns] + list(self.filters)))
+
+def load_pivot_specs(spec_file: str) -> List[PivotSpec]:
+    """Read pivot specs from a JSON or YAML file holding a list of pivots or a 'pivots' list."""
+    with open(spec_file, encoding='utf-8') as f:
+        text = f.read()
+
+    if os.path.splitext(spec_file)[1].lower() in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("PyYAML is required to read YAML pivot specs; install it with "
+                              "'pip install pyyaml' or write the spec as JSON") from None
+        document = yaml.safe_load(text)
+    else:
+        document = json.loads(text)
+
+    if isinstance(document, dict):
+        document = document.get('pivots')
+    if not isinstance(document, list) or not document:
+        raise ValueError(f"{spec_file} must hold a list of pivots or a 'pivots' list")
+    return build_specs(document)
+
+def build_specs(entries: List[Dict]) -> List[PivotSpec]:
+    """Build specs from spec file entries, checking every sheet name is unique."""
+    specs = [PivotSpec.from_dict(entry) for entry in entries]
+    sheets = [spec.sheet for spec in specs]
+    duplicates = sorted({sheet for sheet in sheets if sheets.count(sheet) > 1})
+    if duplicates:
+        raise ValueError(f"Pivot sheet names must be unique: {', '.join(duplicates)}")
+    return specs
+
+def _finish(stats, aggfunc: str):
+    """Turn rolled-up partial statistics, per group or overall, into the aggregated value."""
+    if aggfunc == 'mean':
+        # Groups without a single number have no mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return stats['sum'] / stats['numbers']
+    return stats[aggfunc]
+
+class SpecCube:
+    """Partial statistics of one value column accumulated by a set of key columns.
+
+    Holds, per key combination, the non-missing count, row count and, when
+    a numeric aggregation needs them, the count, sum, min and max of the
+    values as numbers. Any pivot over a subset of the keys rolls up from it.
+    """
+
+    def __init__(self, keys: List[str], value: str, numeric: bool = False):
+        self.keys = list(keys)
+        self.value = value
+        self.numeric = numeric
+        self.stats: Dict[tuple, list] = {}
+
+    def covers(self, spec: PivotSpec) -> bool:
+        """Check whether a spec can be rolled up from this cube."""
+        return spec.values == self.value and set(spec.keys()) <= set(self.keys)
+
+    def statistics(self) -> List[str]:
+        """Return the names of the statistics kept per group."""
+        return list(STAT_ROLLUPS) if self.numeric else ['count', 'size']
+
+    def update(self, df: pd.DataFrame) -> 'SpecCube':
+        """Add a batch of rows to the cube with a single group-by."""
+        if len(df) == 0:
+            return self
+
+        data = df[list(dict.fromkeys(self.keys + [self.value]))]
+        aggregations = {'count': (self.value, 'count'), 'size': (self.value, 'size')}
+        if self.numeric:
+            data = data.assign(_number=pd.to_numeric(df[self.value].astype(object), errors='coerce'))
+            aggregations.update(numbers=('_number', 'count'), sum=('_number', 'sum'),
+                                min=('_number', 'min'), max=('_number', 'max'))
+        partial = data.groupby(self.keys, dropna=False, observed=True, sort=False).agg(**aggregations)
+
+        rollups = [_COMBINE[STAT_ROLLUPS[name]] for name in partial.columns]
+        for key, row in zip(partial.index, partial.itertuples(index=False, name=None)):
+            key = tuple(normalize_key(part) for part in (key if isinstance(key, tuple) else (key,)))
+            current = self.stats.get(key)
+            self.stats[key] = list(row) if current is None else \
+                [combine(a, b) for combine, a, b in zip(rollups, current, row)]
+        return self
+
+    def merge(self, other: 'SpecCube') -> 'SpecCube':
+        """Fold the statistics of a cube over the same keys and value into this one."""
+        if other.keys != self.keys or other.value != self.value or other.numeric != self.numeric:
+            raise ValueError("Cannot merge cubes built over different keys or values")
+
+        rollups = [_COMBINE[STAT_ROLLUPS[name]] for name in self.statistics()]
+        for key, row in other.stats.items():
+            current = self.stats.get(key)
+            self.stats[key] = list(row) if current is None else \
+                [combine(a, b) for combine, a, b in zip(rollups, current, row)]
+        return self
+
+    def fill_missing_keys(self, column: str, value) -> 'SpecCube':
+        """Relabel missing values of one key column, combining groups that become the same."""
+        position = self.keys.index(column)
+        stats, self.stats = self.stats, {}
+        rollups = [_COMBINE[STAT_ROLLUPS[name]] for name in self.statistics()]
+        for key, row in stats.items():
+            if key[position] is None:
+                key = key[:position] + (value,) + key[position + 1:]
+            current = self.stats.get(key)
+            self.stats[key] = row if current is None else \
+                [combine(a, b) for combine, a, b in zip(rollups, current, row)]
+        return self
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the cube as one row per key combination with a column per statistic."""
+        frame = pd.DataFrame(list(self.stats.keys()), columns=self.keys, dtype=object)
+        statistics = pd.DataFrame(list(self.stats.values()), columns=self.statistics())
+        for name in statistics.columns:
+            frame[name] = statistics[name]
+        return frame
+
+    def pivot(self, spec: PivotSpec) -> pd.DataFrame:
+        """Roll the cube up into a spec's pivot table, margins included, with index levels still set.
+
+        For the count aggregation this matches pd.pivot_table(values=...,
+        aggfunc='count', fill_value=0, margins=True) over the filtered rows.
+        """
+        frame = self.to_frame()
+        for key, value in spec.filters.items():
+            frame = frame[frame[key].isin(value if isinstance(value, list) else [value])]
+
+        # Rows missing any of the pivot keys are left out, as with dropna=True
+        frame = frame.dropna(subset=spec.rows + [spec.columns])
+        statistics = self.statistics()
+        rollups = {name: STAT_ROLLUPS[name] for name in statistics}
+
+        cells = frame.groupby(spec.rows + [spec.columns])[statistics].agg(rollups)
+        table = _finish(cells, spec.aggfunc).unstack(spec.columns, fill_value=spec.fill_value)
+        table = sort_table(table)
+
+        if spec.margins:
+            # Margins aggregate the underlying groups, so min, max and mean are exact too
+            table[spec.margins_name] = _finish(frame.groupby(spec.rows)[statistics].agg(rollups), spec.aggfunc)
+            totals = _finish(frame.groupby(spec.columns)[statistics].agg(rollups), spec.aggfunc)
+            totals[spec.margins_name] = _finish(frame[statistics].agg(rollups), spec.aggfunc)
+            margin_key = spec.margins_name if len(spec.rows) == 1 \
+                else (spec.margins_name,) + ('',) * (len(spec.rows) - 1)
+            table.loc[margin_key, :] = totals.reindex(table.columns)
+
+        if spec.aggfunc in ('count', 'size'):
+            return table.astype('int64')
+        return table
+
+class PivotPlan:
+    """Computes every pivot of a set of specs together, in one pass over the data.
+
+    Specs over the same value column share a cube whenever one's keys are a
+    subset of another's, so each batch is grouped once per distinct cube
+    rather than once per pivot.
+    """
+
+    def __init__(self, specs: List[PivotSpec]):
+        self.specs = list(specs)
+        self.cubes: List[SpecCube] = []
+        self.cube_for: Dict[str, SpecCube] = {}
+
+        # Place the widest specs first so narrower ones land in their cubes
+        for spec in sorted(self.specs, key=lambda spec: -len(spec.keys())):
+            cube = next((cube for cube in self.cubes if cube.covers(spec)), None)
+            if cube is None:
+                cube = SpecCube(spec.keys(), spec.values)
+                self.cubes.append(cube)
+            cube.numeric = cube.numeric or spec.aggfunc in NUMERIC_AGGFUNCS
+            self.cube_for[spec.sheet] = cube
+
+    def update(self, df: pd.DataFrame) -> 'PivotPlan':
+        """Add a batch of rows to every cube."""
+        for cube in self.cubes:
+            missing = [column for column in cube.keys + [cube.value] if column not in df.columns]
+            if missing:
+                raise ValueError(f"Pivot specs refer to columns the data doesn't have: {', '.join(missing)}")
+            cube.update(df)
+        return self
+
+    def merge(self, other: 'PivotPlan') -> 'PivotPlan':
+        """Fold the cubes of a plan built from the same specs into this one."""
+        for cube, other_cube in zip(self.cubes, other.cubes):
+            cube.merge(other_cube)
+        return self
+
+    def key_columns(self) -> List[str]:
+        """Return every column any pivot groups by."""
+        return list(dict.fromkeys(column for cube in self.cubes for column in cube.keys))
+
+    def fill_missing_keys(self, column: str, value) -> 'PivotPlan':
+        """Relabel missing values of a key column in every cube grouping by it."""
+        for cube in self.cubes:
+            if column in cube.keys:
+                cube.fill_missing_keys(column, value)
+        return self
+
+    def frames(self) -> Dict[str, pd.DataFrame]:
+        """Build every pivot sheet as it is written, in spec order."""
+        frames = {}
+        for spec in self.specs:
+            frame = self.cube_for[spec.sheet].pivot(spec).reset_index()
+            for position, column in enumerate(spec.blank_columns):
+                frame.insert(position, column, '')
+            frames[spec.sheet] = frame
+        return frames
@@ -0,0 +1,150 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+def _peak_rss_mb() -> Optional[float]:
+    """Return the process's peak resident set size in MB, if the platform reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+class StageStats:
+    """Totals for one named stage, accumulated across every time the stage runs."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.rows = 0
+        self.rss_growth_mb = 0.0
+        self.py_peak_mb: Optional[float] = None
+
+    def to_record(self) -> Dict:
+        """Return the stage totals as a JSON-serializable dict."""
+        return {
+            'stage': self.name,
+            'calls': self.calls,
+            'wall_s': round(self.wall_s, 6),
+            'cpu_s': round(self.cpu_s, 6),
+            'rows': self.rows,
+            'rows_per_s': round(self.rows / self.wall_s, 1) if self.rows and self.wall_s else None,
+            'rss_growth_mb': round(self.rss_growth_mb, 3),
+            'py_peak_mb': round(self.py_peak_mb, 3) if self.py_peak_mb is not None else None,
+        }
+
+class Profiler:
+    """Collects wall time, CPU time, memory and row counts for named pipeline stages.
+
+    A disabled profiler keeps the same interface but records nothing, so the
+    pipeline code does not need separate profiled and unprofiled paths.
+    Python heap peaks come from tracemalloc, which slows allocation-heavy
+    stages several-fold, so it only runs when trace_python is set. Named
+    counters, such as cache hit rates, are reported after the stages.
+    """
+
+    def __init__(self, enabled: bool = False, output: Optional[str] = None,
+                 trace_python: bool = False):
+        self.enabled = enabled
+        self.output = output
+        self.trace_python = enabled and trace_python
+        self.stages: Dict[str, StageStats] = {}
+        self.context: Dict = {}
+        self.counters: Dict[str, Dict] = {}
+        if self.trace_python and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        """Time the enclosed block as one run of the named stage.
+
+        Callers add processed rows to the yielded stats' rows attribute.
+        """
+        stats = self.stages.setdefault(name, StageStats(name))
+        if not self.enabled:
+            yield stats
+            return
+
+        if self.trace_python:
+            tracemalloc.reset_peak()
+        rss_before = _peak_rss_mb()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield stats
+        finally:
+            stats.calls += 1
+            stats.wall_s += time.perf_counter() - wall_start
+            stats.cpu_s += time.process_time() - cpu_start
+            if self.trace_python:
+                peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+                stats.py_peak_mb = max(stats.py_peak_mb or 0.0, peak)
+            if rss_before is not None:
+                stats.rss_growth_mb += _peak_rss_mb() - rss_before
+
+    def iterate(self, name: str, iterable: Iterable) -> Iterator:
+        """Yield from a batch iterable, timing each fetch as the named stage."""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name) as stats:
+                try:
+                    batch = next(iterator)
+                except StopIteration:
+                    return
+                stats.rows += len(batch)
+            yield batch
+
+    def report(self) -> None:
+        """Emit one JSON line per stage and per counter to the configured output, or stderr."""
+        if not self.enabled:
+            return
+
+        peak_rss = _peak_rss_mb()
+        lines = []
+        for stats in self.stages.values():
+            record = dict(self.context)
+            record.update(stats.to_record())
+            record['peak_rss_mb'] = round(peak_rss, 3) if peak_rss is not None else None
+            lines.append(json.dumps(record))
+        for name, values in self.counters.items():
+            record = dict(self.context)
+            record['counter'] = name
+            record.update(values)
+            lines.append(json.dumps(record))
+
+        if self.output:
+            with open(self.output, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+        else:
+            print('\n'.join(lines), file=sys.stderr)
+
+def _env_flag(name: str) -> bool:
+    """Check whether an environment variable is set to a true-ish value."""
+    return os.environ.get(name, '') not in ('', '0', 'false', 'False')
+
+def get_profiler(enabled: Optional[bool] = None) -> Profiler:
+    """Build a profiler, enabled explicitly or through the EXCEL_PROFILE environment variable.
+
+    Records go to the file named by EXCEL_PROFILE_OUTPUT when set, otherwise
+    stderr. EXCEL_PROFILE_TRACEMALLOC=1 adds Python heap peaks per stage.
+    """
+    if enabled is None:
+        enabled = _env_flag('EXCEL_PROFILE')
+    return Profiler(enabled, os.environ.get('EXCEL_PROFILE_OUTPUT') or None,
+                    _env_flag('EXCEL_PROFILE_TRACEMALLOC'))
+
+def pop_profile_flag(argv):
+    """Remove a --profile flag from an argument list, returning the remaining arguments and whether it was set."""
+    remaining = [arg for arg in argv if arg != '--profile']
+    return remaining, len(remaining) != len(argv)
@@ -0,0 +1,298 @@
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+from excel_processor import process_file
+from generate_markdown import write_markdown
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+
+# Jobs waiting for a worker beyond which new uploads are turned away with 503
+DEFAULT_QUEUE_SIZE = 16
+
+# Connections handled at once; the rest are refused rather than left to pile up
+DEFAULT_MAX_CONNECTIONS = 64
+
+DEFAULT_MAX_UPLOAD_BYTES = 256 * 1024 * 1024
+
+# Seconds a client gets to send its request before the connection is dropped
+REQUEST_TIMEOUT = 60
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           411: 'Length Required', 413: 'Payload Too Large', 500: 'Internal Server Error',
+           503: 'Service Unavailable'}
+
+def _run_process(input_file: str, output_file: str) -> None:
+    """Worker entry point for the pivot workbook endpoint."""
+    process_file(input_file, output_file)
+
+def _run_markdown(input_file: str, output_file: str) -> None:
+    """Worker entry point for the markdown endpoint."""
+    write_markdown(input_file, output_file)
+
+def _warm_up() -> int:
+    """Give a new worker something to do so it is started and importing before the first upload."""
+    return os.getpid()
+
+# Endpoint path -> (worker function, output suffix, response content type)
+ENDPOINTS = {
+    '/process': (_run_process, '.xlsx', XLSX_CONTENT_TYPE),
+    '/markdown': (_run_markdown, '.md', 'text/markdown; charset=utf-8'),
+}
+
+class HttpError(Exception):
+    """An error answered with its status code and message instead of a result."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class ReportService:
+    """HTTP front end that queues uploaded workbooks for a pool of warm worker processes.
+
+    Each upload becomes a job on a bounded queue drained by one dispatcher
+    per worker, so at most `workers` jobs run at a time and at most
+    `queue_size` wait. Uploads arriving while the queue is full get 503 with
+    Retry-After instead of waiting, and connections beyond max_connections
+    are refused the same way. A worker dying, e.g. killed for running out
+    of memory, breaks the whole pool; it is replaced with a warm one and the
+    jobs it was running are retried once.
+    """
+
+    def __init__(self, workers: Optional[int] = None, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_upload_bytes: int = DEFAULT_MAX_UPLOAD_BYTES):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.max_connections = max_connections
+        self.max_upload_bytes = max_upload_bytes
+        self.active_connections = 0
+        self.completed = 0
+        self.failed = 0
+        self.restarts = 0
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.queue: Optional[asyncio.Queue] = None
+        self.dispatchers: List[asyncio.Task] = []
+        self.pool_lock: Optional[asyncio.Lock] = None
+
+    async def start(self) -> None:
+        """Start the worker processes and the dispatchers feeding them."""
+        self.executor = await self._start_pool()
+        self.pool_lock = asyncio.Lock()
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the dispatchers and shut the worker pool down."""
+        for task in self.dispatchers:
+            task.cancel()
+        await asyncio.gather(*self.dispatchers, return_exceptions=True)
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    async def _start_pool(self) -> ProcessPoolExecutor:
+        """Start a pool of workers and wait until every one of them is up."""
+        loop = asyncio.get_running_loop()
+        executor = ProcessPoolExecutor(max_workers=self.workers)
+        await asyncio.gather(*(loop.run_in_executor(executor, _warm_up) for _ in range(self.workers)))
+        return executor
+
+    async def _restart_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Replace a pool a worker died in, unless another dispatcher already has."""
+        async with self.pool_lock:
+            if self.executor is not broken:
+                return
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.executor = await self._start_pool()
+            self.restarts += 1
+
+    async def _run(self, function, input_file: str, output_file: str) -> None:
+        """Run a job in the pool, retrying it once on a new pool if a worker died under it."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self.executor
+            try:
+                await loop.run_in_executor(executor, function, input_file, output_file)
+                return
+            except BrokenProcessPool:
+                # Every job running in the pool fails with it, not only the one that killed the worker
+                await self._restart_pool(executor)
+                if attempt:
+                    raise
+
+    async def _dispatch(self) -> None:
+        """Hand queued jobs to the pool one at a time, resolving each job's future."""
+        while True:
+            function, input_file, output_file, result = await self.queue.get()
+            try:
+                if not result.cancelled():
+                    await self._run(function, input_file, output_file)
+                    result.set_result(None)
+            except Exception as e:
+                if not result.cancelled():
+                    result.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    async def submit(self, function, input_file: str, output_file: str) -> None:
+        """Queue a job and wait for it to finish, or fail fast when the queue is full."""
+        result = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((function, input_file, output_file, result))
+        except asyncio.QueueFull:
+            raise HttpError(503, "Job queue is full, retry shortly")
+        await result
+
+    def stats(self) -> Dict:
+        """Current load figures for the health endpoint."""
+        return {
+            'workers': self.workers,
+            'queued': self.queue.qsize(),
+            'queue_size': self.queue_size,
+            'active_connections': self.active_connections,
+            'completed': self.completed,
+            'failed': self.failed,
+            'pool_restarts': self.restarts,
+        }
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one request per connection."""
+        self.active_connections += 1
+        try:
+            if self.active_connections > self.max_connections:
+                await self._respond(writer, 503, b"Too many concurrent requests, retry shortly\n",
+                                    'text/plain; charset=utf-8')
+                return
+            try:
+                method, path, body = await asyncio.wait_for(self._read_request(reader), REQUEST_TIMEOUT)
+                status, content, content_type = await self._route(method, path, body)
+            except HttpError as e:
+                status, content, content_type = e.status, f"{e}\n".encode(), 'text/plain; charset=utf-8'
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                return
+            await self._respond(writer, status, content, content_type)
+        finally:
+            self.active_connections -= 1
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+        """Parse the request line, headers and Content-Length body."""
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        try:
+            method, target, _ = request_line.split(' ', 2)
+        except ValueError:
+            raise HttpError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1')
+            if line in ('\r\n', '\n', ''):
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        body = b''
+        if method == 'POST':
+            if 'content-length' not in headers:
+                raise HttpError(411, "Uploads need a Content-Length header")
+            try:
+                length = int(headers['content-length'])
+            except ValueError:
+                raise HttpError(400, "Invalid Content-Length header")
+            if length > self.max_upload_bytes:
+                raise HttpError(413, f"Upload exceeds {self.max_upload_bytes} bytes")
+            body = await reader.readexactly(length)
+
+        return method, target.split('?', 1)[0], body
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, bytes, str]:
+        """Dispatch a parsed request to its endpoint."""
+        if path == '/health':
+            return 200, json.dumps(self.stats()).encode(), 'application/json'
+        if path not in ENDPOINTS:
+            raise HttpError(404, f"Unknown endpoint {path}")
+        if method != 'POST':
+            raise HttpError(405, "Upload the workbook with POST")
+        if not body:
+            raise HttpError(400, "Empty upload")
+
+        function, suffix, content_type = ENDPOINTS[path]
+        work_dir = tempfile.mkdtemp(prefix='report_service_')
+        try:
+            input_file = os.path.join(work_dir, 'input.xlsx')
+            output_file = os.path.join(work_dir, 'output' + suffix)
+            with open(input_file, 'wb') as f:
+                f.write(body)
+            try:
+                await self.submit(function, input_file, output_file)
+            except HttpError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                raise HttpError(500, f"Error processing upload: {str(e)}")
+            self.completed += 1
+            with open(output_file, 'rb') as f:
+                return 200, f.read(), content_type
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, content: bytes, content_type: str) -> None:
+        """Write a complete response and close the connection."""
+        headers = [
+            f"HTTP/1.1 {status} {REASONS[status]}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(content)}",
+            "Connection: close",
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + content)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, **options) -> None:
+    """Run the report service until cancelled."""
+    service = ReportService(**options)
+    await service.start()
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Serving on http://{host}:{port} with {service.workers} workers", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the service command line and return the process exit code."""
+    parser = argparse.ArgumentParser(description="Serve pivot workbooks and markdown reports over HTTP.")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="address to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="jobs allowed to wait for a worker before uploads are refused")
+    parser.add_argument('--max-connections', type=int, default=DEFAULT_MAX_CONNECTIONS,
+                        help="requests handled at once before new ones are refused")
+    parser.add_argument('--max-upload-bytes', type=int, default=DEFAULT_MAX_UPLOAD_BYTES,
+                        help="largest accepted upload")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers, queue_size=args.queue_size,
+                          max_connections=args.max_connections, max_upload_bytes=args.max_upload_bytes))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+import argparse
+import os
+import pickle
+import re
+import sys
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator, List, Optional, Tuple
+from date_utils import now
+from excel_processor import REQUIRED_COLUMNS, ensure_columns, write_pivot_sheets
+from excel_reader import DEFAULT_CHUNK_SIZE
+from generate_markdown import get_cutoff, get_status_order, inclusion_mask, write_sections
+from pivot_cube import PivotCube, normalize_key
+from table_io import open_writer
+from workbook_cache import cache_entry_path, load_batches
+
+INDEX_KEYS = ['Goal Set', 'Team', 'Status']
+
+# Bump when the persisted index layout changes so old entries are rebuilt
+INDEX_VERSION = 1
+
+# Matches every value of a key in SliceIndex.positions
+ALL = object()
+
+class SliceIndex:
+    """Sorted row positions of a frame for every (Goal Set, Team, Status) combination.
+
+    Built with one group-by over the normalized data, after which any slice
+    by goal set, team or status is a lookup of its keys, so reports for
+    many slices don't rescan the whole frame.
+    """
+
+    def __init__(self, positions: Dict[tuple, np.ndarray], rows: int):
+        self.positions_by_key = positions
+        self.rows = rows
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> 'SliceIndex':
+        """Index every row of a frame by its (Goal Set, Team, Status) key."""
+        groups = df.groupby(INDEX_KEYS, dropna=False, observed=True, sort=False).indices
+        positions = {tuple(normalize_key(part) for part in key): np.asarray(rows, dtype=np.int64)
+                     for key, rows in groups.items()}
+        return cls(positions, len(df))
+
+    def values(self, key: str) -> List:
+        """Return the distinct non-missing values of one index key, sorted."""
+        position = INDEX_KEYS.index(key)
+        return sorted({combination[position] for combination in self.positions_by_key
+                       if combination[position] is not None}, key=str)
+
+    def positions(self, goal_set=ALL, team=ALL, status=ALL) -> np.ndarray:
+        """Return the sorted row positions of a slice.
+
+        Each argument is a single value, a collection of values, or ALL.
+        """
+        wanted = [value if value is ALL or isinstance(value, (set, frozenset, list, tuple)) else {value}
+                  for value in (goal_set, team, status)]
+        arrays = [rows for key, rows in self.positions_by_key.items()
+                  if all(accepted is ALL or part in accepted for part, accepted in zip(key, wanted))]
+        if not arrays:
+            return np.empty(0, dtype=np.int64)
+        if len(arrays) == 1:
+            return arrays[0]
+        return np.sort(np.concatenate(arrays), kind='stable')
+
+    def save(self, path: str) -> None:
+        """Persist the index atomically."""
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            pickle.dump({'version': INDEX_VERSION, 'rows': self.rows, 'positions': self.positions_by_key},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['SliceIndex']:
+        """Load a persisted index, or None if it was written by an incompatible version."""
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        if state.get('version') != INDEX_VERSION:
+            return None
+        return cls(state['positions'], state['rows'])
+
+def load_frame(input_file: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+               cache_dir: Optional[str] = None, input_format: Optional[str] = None) -> pd.DataFrame:
+    """Read and normalize a whole input into one frame whose row positions the index refers to."""
+    # Capture the reference year once so every row is labelled against the same clock
+    reference_year = now().year
+    batches = load_batches(input_file, chunk_size=chunk_size, cache_dir=cache_dir, input_format=input_format)
+    df = pd.concat([ensure_columns(batch, REQUIRED_COLUMNS, reference_year=reference_year) for batch in batches])
+    return df.reset_index(drop=True)
+
+def get_slice_index(input_file: str, df: pd.DataFrame, cache_dir: Optional[str] = None) -> SliceIndex:
+    """Return the index for a loaded input, reusing the one persisted in the cache when available."""
+    path = cache_entry_path(input_file, 'slice_index', cache_dir)
+    if path and os.path.exists(path):
+        index = SliceIndex.load(path)
+        if index is not None and index.rows == len(df):
+            return index
+
+    index = SliceIndex.build(df)
+    if path:
+        index.save(path)
+    return index
+
+def slice_status_groups(df: pd.DataFrame, index: SliceIndex, cutoff: pd.Timestamp,
+                        goal_set, team=ALL) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """Yield a slice's included items per status, in display order, straight from the index.
+
+    Matches generate_markdown's grouping, with non-standard and missing
+    statuses collected under New.
+    """
+    order = get_status_order()
+    standard = set(order[:-1])
+    other = {key[2] for key in index.positions_by_key if key[2] not in standard}
+    for status in order:
+        statuses = other if status == 'New' else {status}
+        items = df.take(index.positions(goal_set, team, statuses))
+        yield status, items[inclusion_mask(items, cutoff)]
+
+def write_slice_markdown(df: pd.DataFrame, index: SliceIndex, output_file: str, goal_set,
+                         team=ALL, cutoff: Optional[pd.Timestamp] = None) -> int:
+    """Write the markdown report for one slice and return the number of items in it."""
+    if cutoff is None:
+        cutoff = get_cutoff()
+    with open(output_file, 'w', encoding='utf-8') as f:
+        return write_sections(f, slice_status_groups(df, index, cutoff, goal_set, team))
+
+def write_slice_pivots(df: pd.DataFrame, index: SliceIndex, output_file: str, goal_set=ALL,
+                       team=ALL, output_format: Optional[str] = None) -> PivotCube:
+    """Write the Data and pivot sheets for one slice and return its cube."""
+    rows = df.take(index.positions(goal_set, team))
+    cube = PivotCube().update(rows)
+    with open_writer(output_file, output_format) as writer:
+        writer.write_frame('Data', rows)
+        write_pivot_sheets(writer, cube)
+    return cube
+
+def report_name(goal_set) -> str:
+    """Turn a goal set into a safe file name stem."""
+    return re.sub(r'[^\w.-]+', '_', str(goal_set)).strip('_') or 'goal_set'
+
+def write_reports(input_file: str, output_dir: str, goal_sets: Optional[List] = None,
+                  teams: Optional[List] = None, pivots: bool = False,
+                  cache_dir: Optional[str] = None, input_format: Optional[str] = None) -> List[Tuple[str, int]]:
+    """Render the markdown report, and optionally the pivot workbook, of every goal set in one run.
+
+    The input is read and indexed once; each report then only touches its
+    own rows. Returns (output file, item count) for every markdown report.
+    """
+    df = load_frame(input_file, cache_dir=cache_dir, input_format=input_format)
+    index = get_slice_index(input_file, df, cache_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Use one cutoff for every report in the run
+    cutoff = get_cutoff()
+    team = set(teams) if teams else ALL
+
+    written = []
+    for goal_set in goal_sets or index.values('Goal Set'):
+        stem = os.path.join(output_dir, report_name(goal_set))
+        items = write_slice_markdown(df, index, stem + '.md', goal_set, team, cutoff)
+        written.append((stem + '.md', items))
+        if pivots:
+            write_slice_pivots(df, index, stem + '.xlsx', goal_set, team)
+    return written
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the multi-report command line and return the process exit code."""
+    parser = argparse.ArgumentParser(description="Render a markdown report for every goal set of an export in one run.")
+    parser.add_argument('input_file')
+    parser.add_argument('output_dir', help="directory the <goal set>.md reports are written to")
+    parser.add_argument('--goal-sets', nargs='+', help="goal sets to report on (default: all)")
+    parser.add_argument('--teams', nargs='+', help="only include these teams")
+    parser.add_argument('--pivots', action='store_true', help="also write a <goal set>.xlsx pivot workbook per report")
+    parser.add_argument('--cache-dir', help="cache directory for parsed sheets and the index (default: EXCEL_CACHE_DIR)")
+    args = parser.parse_args(argv)
+
+    try:
+        written = write_reports(args.input_file, args.output_dir, args.goal_sets, args.teams,
+                                args.pivots, args.cache_dir)
+    except Exception as e:
+        print(f"Error generating reports: {str(e)}", file=sys.stderr)
+        return 1
+
+    for output_file, items in written:
+        print(f"{output_file}: {items} items")
+    print(f"Generated {len(written)} reports in {args.output_dir}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
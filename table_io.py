@@ -0,0 +1,391 @@
+import csv
+import os
+import pandas as pd
+from typing import Dict, Iterator, List, Optional
+from excel_reader import DEFAULT_CHUNK_SIZE, SCHEMA_ROWS, iter_excel_batches
+from excel_writer import StreamingExcelWriter, temp_path
+from output_planner import ShardedFileWriter, ShardedSheetWriter
+
+# File extensions and the formats they select when no format is given explicitly
+INPUT_FORMATS = {
+    '.xlsx': 'xlsx',
+    '.xlsm': 'xlsx',
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+}
+OUTPUT_FORMATS = {
+    '.xlsx': 'xlsx',
+    '.xlsm': 'xlsx',
+    '.parquet': 'parquet',
+}
+
+# Bytes of CSV parsed per block by pyarrow's threaded reader
+CSV_BLOCK_SIZE = 16 * 1024 * 1024
+
+# Spellings pd.read_csv turns into booleans
+_BOOLEAN_STRINGS = {'True': True, 'TRUE': True, 'true': True, 'False': False, 'FALSE': False, 'false': False}
+
+def _has_pyarrow() -> bool:
+    """Check whether pyarrow can be imported."""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _require_pyarrow(purpose: str) -> None:
+    """Fail with an actionable message when pyarrow is needed but missing."""
+    if not _has_pyarrow():
+        raise ImportError(f"pyarrow is required to {purpose}; install it with 'pip install pyarrow'")
+
+def detect_format(path: str, file_format: Optional[str] = None, formats: Dict[str, str] = INPUT_FORMATS) -> str:
+    """Return the explicit format if given, otherwise the one implied by the extension, defaulting to xlsx."""
+    if file_format is not None:
+        known = sorted(set(formats.values()))
+        if file_format not in known:
+            raise ValueError(f"Unknown format '{file_format}', expected one of: {', '.join(known)}")
+        return file_format
+
+    extension = os.path.splitext(path.rstrip(os.sep))[1].lower()
+    return formats.get(extension, 'xlsx')
+
+def infer_text_column(column: pd.Series, dtype=None) -> pd.Series:
+    """Give a column of CSV text the dtype pd.read_csv would infer for it.
+
+    Given the dtype earlier rows settled for the column, text stays text and
+    whole numbers in a float column become floats, so batches agree.
+    """
+    if dtype is not None and pd.api.types.is_string_dtype(dtype) and dtype != object:
+        return column
+    values = column.dropna()
+    if len(values) == 0:
+        return column.astype(object)
+    if values.isin(_BOOLEAN_STRINGS.keys()).all():
+        return column.map(_BOOLEAN_STRINGS)
+    try:
+        numbers = pd.to_numeric(column)
+    except (ValueError, TypeError):
+        return column
+    if dtype is not None and pd.api.types.is_float_dtype(dtype) and pd.api.types.is_integer_dtype(numbers.dtype):
+        return numbers.astype(dtype)
+    return numbers
+
+def _csv_header(input_file: str) -> List[str]:
+    """Read the header row of a CSV file."""
+    with open(input_file, newline='', encoding='utf-8') as f:
+        return next(csv.reader(f), [])
+
+def iter_csv_batches(input_file: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame batches of at most chunk_size rows from a CSV file.
+
+    Every column is read as text and given the type pd.read_csv would
+    infer for it over the first SCHEMA_ROWS rows, or the first batch if
+    that is larger; later batches keep those types where their values
+    allow, so types don't change from batch to batch or with chunk_size.
+    At least one batch, possibly empty, is always yielded.
+    """
+    header = _csv_header(input_file)
+    if not header:
+        yield pd.DataFrame()
+        return
+
+    # Hold back whole batches of text until the types are settled
+    schema_rows = max(SCHEMA_ROWS // chunk_size, 1) * chunk_size
+    dtypes: Dict[str, object] = {}
+    settled = False
+
+    pending: List[pd.DataFrame] = []
+    pending_rows = 0
+    start = 0
+    for text in _iter_csv_text(input_file, header, chunk_size):
+        pending.append(text)
+        pending_rows += len(text)
+        if not settled and pending_rows < schema_rows:
+            continue
+        settled = True
+        yield from _typed_batches(pending, dtypes, start, chunk_size)
+        start += pending_rows
+        pending = []
+        pending_rows = 0
+
+    if pending:
+        yield from _typed_batches(pending, dtypes, start, chunk_size)
+    elif start == 0:
+        yield pd.DataFrame(columns=header)
+
+def _iter_csv_text(input_file: str, header: List[str], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield the rows of a CSV file as text, chunk_size rows at a time, with missing values as NaN.
+
+    With pyarrow installed the file is tokenized by its multithreaded
+    reader; without it, pd.read_csv's C parser reads the file in chunks.
+    """
+    if not _has_pyarrow():
+        yield from pd.read_csv(input_file, chunksize=chunk_size, dtype=str)
+        return
+
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    reader = pa_csv.open_csv(
+        input_file,
+        read_options=pa_csv.ReadOptions(use_threads=True, block_size=CSV_BLOCK_SIZE),
+        # Description and comment cells often span lines inside quotes
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(column_types={name: pa.string() for name in header},
+                                              strings_can_be_null=True),
+    )
+
+    pending = None
+    for record_batch in reader:
+        table = pa.Table.from_batches([record_batch])
+        pending = table if pending is None else pa.concat_tables([pending, table])
+        while pending.num_rows >= chunk_size:
+            yield pending.slice(0, chunk_size).to_pandas()
+            pending = pending.slice(chunk_size)
+    if pending is not None and pending.num_rows:
+        yield pending.to_pandas()
+
+def _typed_batches(pending: List[pd.DataFrame], dtypes: Dict[str, object],
+                   start: int, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Type held-back text together and cut it into batches of chunk_size rows indexed from start."""
+    frame = _text_frame(pd.concat(pending, ignore_index=True), dtypes)
+    for offset in range(0, len(frame), chunk_size):
+        batch = frame.iloc[offset:offset + chunk_size]
+        batch.index = pd.RangeIndex(start + offset, start + offset + len(batch))
+        yield batch
+
+def _text_frame(text: pd.DataFrame, dtypes: Dict[str, object]) -> pd.DataFrame:
+    """Type a DataFrame of CSV text, settling each column's dtype in dtypes the first time it has values."""
+    columns = {}
+    for name in text.columns:
+        column = infer_text_column(text[name], dtypes.get(name))
+        if name not in dtypes and text[name].notna().any():
+            dtypes[name] = column.dtype
+        columns[name] = column
+    return pd.DataFrame(columns, copy=False)
+
+def _iter_table_batches(table, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield an Arrow table as DataFrames of at most chunk_size rows with a continuing RangeIndex."""
+    start = 0
+    for record_batch in table.to_batches(max_chunksize=chunk_size):
+        frame = record_batch.to_pandas()
+        frame.index = pd.RangeIndex(start, start + len(frame))
+        start += len(frame)
+        yield frame
+    if start == 0:
+        yield table.schema.empty_table().to_pandas()
+
+def iter_parquet_batches(input_file: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame batches of at most chunk_size rows from a Parquet file, one row group slice at a time."""
+    _require_pyarrow("read Parquet files")
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(input_file)
+    start = 0
+    for record_batch in parquet_file.iter_batches(batch_size=chunk_size):
+        frame = record_batch.to_pandas()
+        frame.index = pd.RangeIndex(start, start + len(frame))
+        start += len(frame)
+        yield frame
+    if start == 0:
+        yield parquet_file.schema_arrow.empty_table().to_pandas()
+
+def iter_arrow_batches(input_file: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame batches of at most chunk_size rows from an Arrow IPC (Feather v2) file or stream."""
+    _require_pyarrow("read Arrow files")
+    import pyarrow as pa
+
+    # Memory-map the file so record batches are read without copying
+    with pa.memory_map(input_file) as source:
+        try:
+            table = pa.ipc.open_file(source).read_all()
+        except pa.ArrowInvalid:
+            source.seek(0)
+            table = pa.ipc.open_stream(source).read_all()
+        yield from _iter_table_batches(table, chunk_size)
+
+def iter_batches(input_file: str, sheet_name: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 input_format: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame batches from any supported input, chosen by input_format or the extension.
+
+    sheet_name only applies to workbooks; the other formats hold one table.
+    """
+    input_format = detect_format(input_file, input_format)
+    if input_format == 'xlsx':
+        return iter_excel_batches(input_file, sheet_name, chunk_size)
+    if input_format == 'csv':
+        return iter_csv_batches(input_file, chunk_size)
+    if input_format == 'parquet':
+        return iter_parquet_batches(input_file, chunk_size)
+    return iter_arrow_batches(input_file, chunk_size)
+
+def _as_text(column: pd.Series) -> pd.Series:
+    """Render every non-missing value of a column as text."""
+    return column.astype(object).map(str, na_action='ignore')
+
+def _arrow_ready(df: pd.DataFrame, schema=None) -> pd.DataFrame:
+    """Convert columns to types Arrow stores consistently from batch to batch.
+
+    Dates are stored as text, since exports mix date cells with date strings
+    and a batch holding only one kind would otherwise fix the wrong type.
+    Whole-number float columns are stored as integers for the same reason.
+    Given the schema of earlier batches, columns it holds as text are
+    rendered as text here too.
+    """
+    import pyarrow as pa
+
+    columns = {}
+    for name in df.columns:
+        column = df[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            categories = column.cat.categories
+            column = column.astype(categories.dtype if categories.dtype != object else object)
+        if pd.api.types.is_float_dtype(column.dtype) and (column.dropna() % 1 == 0).all():
+            # Whole numbers come back as float in batches with blanks; keep them integers throughout
+            column = column.astype('Int64')
+        if pd.api.types.is_datetime64_any_dtype(column.dtype):
+            column = _as_text(column)
+        elif column.dtype == object and pd.api.types.infer_dtype(column, skipna=True) not in ('string', 'empty'):
+            column = _as_text(column)
+        elif schema is not None and pa.types.is_string(schema.field(str(name)).type) \
+                and not pd.api.types.is_string_dtype(column.dtype):
+            column = _as_text(column)
+        columns[str(name)] = column
+    return pd.DataFrame(columns, copy=False)
+
+def _fits(column: pd.Series, arrow_type) -> bool:
+    """Check whether Arrow can store a column's values as the given type."""
+    import pyarrow as pa
+
+    try:
+        pa.array(column, type=arrow_type, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return False
+    return True
+
+class ParquetSheetWriter:
+    """Writes each sheet as its own Parquet file in an output directory.
+
+    The Data sheet streams into one file batch by batch, with its schema
+    fixed by the first batch; dates and columns with no values in that
+    batch are stored as text, as are columns a later batch has values of
+    another type in, earlier rows included. Files are built under
+    temporary names and only replace earlier output once closed. Sheet
+    names map to '<sheet name>.parquet' with spaces replaced by underscores. It has the same interface as
+    StreamingExcelWriter, so pipeline code can write to either.
+    """
+
+    def __init__(self, output_dir: str):
+        _require_pyarrow("write Parquet files")
+        self.output_dir = output_dir
+        self.writers = {}
+        self.created_dir = not os.path.isdir(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
+
+    def sheet_path(self, sheet_name: str) -> str:
+        """Return the file a sheet is written to."""
+        return os.path.join(self.output_dir, sheet_name.replace(' ', '_') + '.parquet')
+
+    def write_frame(self, sheet_name: str, df: pd.DataFrame) -> None:
+        """Append a DataFrame to a sheet's file, creating the file on first use."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if sheet_name not in self.writers:
+            df = _arrow_ready(df)
+            schema = pa.Schema.from_pandas(df, preserve_index=False)
+            for position, field in enumerate(schema):
+                if pa.types.is_null(field.type):
+                    schema = schema.set(position, field.with_type(pa.string()))
+            self.writers[sheet_name] = pq.ParquetWriter(temp_path(self.sheet_path(sheet_name)), schema)
+        else:
+            df = _arrow_ready(df, self.writers[sheet_name].schema)
+
+        writer = self.writers[sheet_name]
+        try:
+            table = pa.Table.from_pandas(df, schema=writer.schema, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # A later batch holds values the file's types can't, e.g. 'FY26' among years;
+            # those columns become text, in the rows already written too
+            conflicts = [field.name for field in writer.schema if not _fits(df[field.name], field.type)]
+            writer = self._widen_to_text(sheet_name, conflicts)
+            df = _arrow_ready(df, writer.schema)
+            table = pa.Table.from_pandas(df, schema=writer.schema, preserve_index=False)
+        writer.write_table(table)
+
+    def _widen_to_text(self, sheet_name: str, columns: List[str]):
+        """Rewrite a sheet's file so far with the given columns stored as text, returning its new writer."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = self.writers[sheet_name].schema
+        for name in columns:
+            position = schema.get_field_index(name)
+            schema = schema.set(position, schema.field(position).with_type(pa.string()))
+
+        self.writers[sheet_name].close()
+        path = temp_path(self.sheet_path(sheet_name))
+        previous = temp_path(path)
+        os.replace(path, previous)
+        try:
+            writer = self.writers[sheet_name] = pq.ParquetWriter(path, schema)
+            for record_batch in pq.ParquetFile(previous).iter_batches():
+                writer.write_table(pa.Table.from_batches([record_batch]).cast(schema))
+        finally:
+            os.remove(previous)
+        return writer
+
+    def set_auto_filter(self, sheet_name: str) -> None:
+        """Parquet files have no filters; kept so callers can treat every writer alike."""
+
+    def close(self) -> None:
+        """Finish every sheet's file."""
+        try:
+            for writer in self.writers.values():
+                writer.close()
+        except BaseException:
+            self.discard()
+            raise
+        for sheet_name in self.writers:
+            os.replace(temp_path(self.sheet_path(sheet_name)), self.sheet_path(sheet_name))
+
+    def discard(self) -> None:
+        """Abandon every sheet's file, leaving earlier output untouched."""
+        for sheet_name, writer in self.writers.items():
+            try:
+                writer.close()
+            finally:
+                path = temp_path(self.sheet_path(sheet_name))
+                if os.path.exists(path):
+                    os.remove(path)
+        if self.created_dir and not os.listdir(self.output_dir):
+            os.rmdir(self.output_dir)
+
+    def __enter__(self) -> 'ParquetSheetWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+def open_writer(output_file: str, output_format: Optional[str] = None, engine: Optional[str] = None,
+                shard_rows: Optional[int] = None, shard_files: bool = False, workers: Optional[int] = None):
+    """Open the sheet writer for an output, chosen by output_format or the extension.
+
+    Parquet output is a directory with one file per sheet. Workbooks
+    continue the Data sheet on Data 2, Data 3, ... past shard_rows rows,
+    which defaults to the most a worksheet holds; with shard_files the
+    shards become workbooks of their own, serialized by up to workers
+    processes. engine and the sharding options only apply to workbooks.
+    """
+    if detect_format(output_file, output_format, OUTPUT_FORMATS) == 'parquet':
+        return ParquetSheetWriter(output_file)
+    if shard_files:
+        return ShardedFileWriter(output_file, shard_rows, engine, workers)
+    return ShardedSheetWriter(StreamingExcelWriter(output_file, engine), shard_rows)
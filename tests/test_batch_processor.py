@@ -0,0 +1,22 @@
+import os
+from batch_processor import jobs_from_glob, process_batch
+
+def test_glob_outputs_are_workbooks(tmp_path):
+    for name in ('a.csv', 'b.xlsx', 'c.parquet'):
+        (tmp_path / name).write_text('', encoding='utf-8')
+    jobs = jobs_from_glob([str(tmp_path / '*')], 'out')
+    assert [output for _, output in jobs] == [os.path.join('out', name) for name in ('a.xlsx', 'b.xlsx', 'c.xlsx')]
+
+def test_jobs_sharing_an_output_fail_without_running(tmp_path):
+    jobs = [(str(tmp_path / 'd1' / 'x.xlsx'), str(tmp_path / 'out' / 'x.xlsx')),
+            (str(tmp_path / 'd2' / 'x.csv'), str(tmp_path / 'out' / 'x.xlsx'))]
+
+    results = process_batch(jobs, workers=1)
+
+    assert [error.startswith("Output file is also the output of") for _, _, error in results] == [True, True]
+    assert os.listdir(tmp_path / 'out') == []
+
+def test_overlapping_patterns_process_a_file_once(tmp_path):
+    (tmp_path / 'a.xlsx').write_text('', encoding='utf-8')
+    jobs = jobs_from_glob([str(tmp_path / '*.xlsx'), str(tmp_path / 'a*')], 'out')
+    assert len(jobs) == 1
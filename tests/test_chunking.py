@@ -0,0 +1,61 @@
+import datetime
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+from excel_processor import process_file
+from generate_markdown import write_markdown
+from profiling import Profiler
+
+HEADER = ['ID', 'Team', 'Goal Set', 'Status', 'Title', 'Description', 'Date', 'Modified', 'Created',
+          'Status Comments', 'Path to Green', 'Modified By', 'Orig Due Date', 'Owners', 'Priority']
+
+def _row(i):
+    # Early rows hold text and blanks, later ones date cells, so small batches see only one kind
+    date = ('TBD' if i % 3 else None) if i < 10 else (None if i % 4 == 0 else datetime.datetime(2026, 1 + i % 12, 1))
+    return [i, f'Team {i % 3}', 'LT', ['Red', 'Yellow', 'Completed'][i % 3], f'Goal {i}', f'Description {i}',
+            date, '2026-09-01', '2026-09-01', None, None, 'Someone', date, 'Owner',
+            i % 5 if i < 20 else (None if i % 2 else 2.5)]
+
+@pytest.fixture
+def workbook(tmp_path, monkeypatch):
+    monkeypatch.setenv('EXCEL_AS_OF', '2026-10-01')
+    monkeypatch.delenv('EXCEL_CACHE_DIR', raising=False)
+    book = Workbook()
+    sheet = book.active
+    sheet.append(HEADER)
+    for i in range(60):
+        sheet.append(_row(i))
+    path = tmp_path / 'input.xlsx'
+    book.save(path)
+    return path
+
+def test_markdown_does_not_depend_on_chunk_size(workbook, tmp_path):
+    outputs = []
+    for chunk_size in (7, 50000):
+        output_file = tmp_path / f'{chunk_size}.md'
+        write_markdown(str(workbook), str(output_file), chunk_size=chunk_size)
+        outputs.append(output_file.read_text(encoding='utf-8'))
+    assert outputs[0] == outputs[1]
+    assert 'on NaT' not in outputs[0]
+
+def test_data_sheet_does_not_depend_on_chunk_size(workbook, tmp_path):
+    sheets = []
+    for chunk_size in (7, 50000):
+        output_file = tmp_path / f'{chunk_size}.xlsx'
+        process_file(str(workbook), str(output_file), chunk_size=chunk_size, engine='openpyxl')
+        sheets.append(pd.read_excel(output_file, sheet_name=None))
+    assert sheets[0].keys() == sheets[1].keys()
+    for name in sheets[0]:
+        pd.testing.assert_frame_equal(sheets[0][name], sheets[1][name])
+
+def test_date_parse_counters_cover_only_their_own_run(workbook, tmp_path):
+    counters = []
+    for run in range(2):
+        profiler = Profiler()
+        process_file(str(workbook), str(tmp_path / f'{run}.xlsx'), engine='openpyxl', profiler=profiler)
+        counters.append(profiler.counters['date_parse'])
+        profiler = Profiler()
+        write_markdown(str(workbook), str(tmp_path / f'{run}.md'), profiler=profiler)
+        counters.append(profiler.counters['date_parse'])
+    assert counters[0]['rows'] > 0
+    assert counters[2:] == counters[:2]
@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+import date_utils
+
+VALUES = ['2025-01-02', '03/04/2025', 'TBD', '', None, '2025-01-02', '03/04/2025'] * 50
+
+@pytest.mark.parametrize('dtype', ['str', object, 'category'])
+def test_parse_dates_parses_each_distinct_text_value_once(dtype):
+    values = pd.Series(VALUES, dtype=dtype)
+    date_utils.reset_parse_stats()
+
+    parsed = date_utils.parse_dates(values)
+
+    stats = date_utils.parse_stats()['columns']
+    assert stats['rows'] == len(values)
+    assert stats['parsed'] == 4
+    expected, _ = date_utils._parse_values(pd.Series(VALUES, dtype=object), None)
+    assert parsed.tolist() == expected.tolist()
+
+def test_parse_dates_with_offsets_flags_only_values_that_had_one():
+    values = pd.Series(['2025-01-02T10:00:00+02:00', '2025-01-02', None, '2025-01-02T10:00:00+02:00'],
+                       dtype=object)
+
+    parsed, offsets = date_utils.parse_dates_with_offsets(values)
+
+    assert parsed.tolist()[:2] == [pd.Timestamp('2025-01-02 10:00'), pd.Timestamp('2025-01-02')]
+    assert offsets.tolist() == [True, False, False, True]
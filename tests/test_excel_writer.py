@@ -0,0 +1,22 @@
+import os
+import pandas as pd
+import pytest
+from excel_writer import StreamingExcelWriter
+
+def test_failed_write_leaves_no_workbook(tmp_path):
+    output_file = str(tmp_path / 'out.xlsx')
+    with pytest.raises(RuntimeError):
+        with StreamingExcelWriter(output_file, 'openpyxl') as writer:
+            writer.write_frame('Data', pd.DataFrame({'ID': [1, 2]}))
+            raise RuntimeError("input went away")
+    assert os.listdir(tmp_path) == []
+
+def test_failed_write_keeps_earlier_workbook(tmp_path):
+    output_file = str(tmp_path / 'out.xlsx')
+    with StreamingExcelWriter(output_file, 'openpyxl') as writer:
+        writer.write_frame('Data', pd.DataFrame({'ID': [1, 2]}))
+    with pytest.raises(RuntimeError):
+        with StreamingExcelWriter(output_file, 'openpyxl') as writer:
+            raise RuntimeError("input went away")
+    assert os.listdir(tmp_path) == ['out.xlsx']
+    assert pd.read_excel(output_file)['ID'].tolist() == [1, 2]
@@ -0,0 +1,15 @@
+from datetime import datetime
+import pandas as pd
+from generate_markdown import inclusion_mask
+
+def test_dates_with_a_utc_offset_are_never_recent():
+    # The row-by-row check compared these with a naive cutoff, which failed and excluded them
+    df = pd.DataFrame({
+        'Status': ['Completed', 'Green', 'Completed', 'Green', 'Red'],
+        'Modified': ['2026-10-01T09:00:00+00:00', '', '2026-10-01 09:00', '', '2026-10-01T09:00:00Z'],
+        'Created': ['', '2026-10-01T09:00:00-05:00', '', '2026-10-01', ''],
+    })
+
+    mask = inclusion_mask(df, datetime(2026, 7, 1))
+
+    assert mask.tolist() == [False, False, True, True, True]
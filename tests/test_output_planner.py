@@ -0,0 +1,17 @@
+import pandas as pd
+from output_planner import ShardedFileWriter
+
+def _write(output_file, rows):
+    with ShardedFileWriter(output_file, shard_rows=10, engine='openpyxl', workers=1) as writer:
+        writer.write_frame('Data', pd.DataFrame({'ID': range(rows)}))
+        writer.write_frame('Summary', pd.DataFrame({'Total': [rows]}))
+
+def test_shard_files_of_a_larger_earlier_run_are_removed(tmp_path):
+    output_file = str(tmp_path / 'out.xlsx')
+    _write(output_file, 45)
+    assert len(list(tmp_path.iterdir())) == 5
+
+    _write(output_file, 15)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['out.xlsx', 'out_2.xlsx']
+    assert pd.read_excel(tmp_path / 'out_2.xlsx')['ID'].tolist() == list(range(10, 15))
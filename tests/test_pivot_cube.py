@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+from pivot_cube import PivotCube
+
+FRAMES = {
+    'text': pd.DataFrame({'Goal Set': 'LT', 'Team': ['A', 'B', 'A', 'C', 'B', 'A'],
+                          'Status': ['Red', 'Green', 'Green', 'Red', 'Red', 'Red'],
+                          'Quarter': ['Q1', 'Q2', '', 'Q1', 'Q2', 'Q1'], 'ID': [1, 2, 3, 4, 5, 6]}),
+    'mixed': pd.DataFrame({'Goal Set': 'LT', 'Team': [1, 'B', 2, 'C', 2.5, 'A'],
+                           'Status': ['Red', 3, 'Red', 'Green', 'Green', 3],
+                           'Quarter': ['Q1', 'Q2', 'Q1', 'Q1', 'Q2', 'Q2'], 'ID': range(6)}),
+}
+
+@pytest.mark.parametrize('name', sorted(FRAMES))
+@pytest.mark.parametrize('index, columns', [(['Team'], 'Status'), (['Team', 'Status'], 'Quarter')])
+def test_pivot_matches_pivot_table(name, index, columns):
+    frame = FRAMES[name]
+    # Batches fed separately roll up to the same table as the whole frame
+    cube = PivotCube().update(frame.iloc[:3]).update(frame.iloc[3:])
+
+    table = cube.pivot(index=index, columns=columns)
+
+    expected = pd.pivot_table(frame, values='ID', index=index, columns=columns, aggfunc='count',
+                              fill_value=0, margins=True, margins_name='Total')
+    assert table.index.tolist() == expected.index.tolist()
+    assert table.columns.tolist() == expected.columns.tolist()
+    assert table.to_numpy().tolist() == expected.to_numpy().tolist()
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+from pivot_spec import PivotPlan, PivotSpec
+
+FRAME = pd.DataFrame({'Team': ['A', 'A', 'B', 'B', 'C'], 'Status': ['Red', 'Green', 'Red', 'Red', 'Green'],
+                      'ID': [1, 2, 3, None, 5], 'Priority': [1.0, 2.0, 4.0, 6.0, 3.0]})
+
+def test_mean_leaves_cells_without_rows_missing():
+    spec = PivotSpec('Mean', ['Team'], 'Status', values='Priority', aggfunc='mean')
+    table = PivotPlan([spec]).update(FRAME).frames()['Mean'].set_index('Team')
+
+    expected = pd.pivot_table(FRAME, index='Team', columns='Status', values='Priority',
+                              aggfunc='mean', margins=True, margins_name='Total')
+    assert np.isnan(table.loc['B', 'Green'])
+    np.testing.assert_allclose(table.to_numpy(dtype=float), expected.to_numpy(dtype=float))
+
+def test_count_fills_cells_without_rows_with_zero():
+    spec = PivotSpec('Count', ['Team'], 'Status')
+    table = PivotPlan([spec]).update(FRAME).frames()['Count'].set_index('Team')
+    assert spec.fill_value == 0
+    assert table.loc['B', 'Green'] == 0
+    assert table.loc['B', 'Red'] == 1
+
+def test_keys_mixing_numbers_and_text_sort_as_pivot_table_does():
+    frame = pd.DataFrame({'Priority': [1, 2, 'High', 1, 'Low', 2.5], 'Quarter': ['Q1', 'Q2', 'Q1', "Q2'25", 'Q1', 'Q2'],
+                          'ID': range(6)})
+    spec = PivotSpec('Priority by Quarter', ['Priority'], 'Quarter')
+    table = PivotPlan([spec]).update(frame).frames()['Priority by Quarter'].set_index('Priority')
+
+    expected = pd.pivot_table(frame, index='Priority', columns='Quarter', values='ID', aggfunc='count',
+                              fill_value=0, margins=True, margins_name='Total')
+    assert table.index.tolist() == expected.index.tolist()
+    assert table.columns.tolist() == expected.columns.tolist()
+    assert table.to_numpy().tolist() == expected.to_numpy().tolist()
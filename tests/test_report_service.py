@@ -0,0 +1,27 @@
+import asyncio
+import os
+import shutil
+import signal
+from report_service import ReportService
+
+def test_service_keeps_working_after_a_worker_dies(tmp_path):
+    input_file = tmp_path / 'input.txt'
+    input_file.write_text('report', encoding='utf-8')
+
+    async def run():
+        service = ReportService(workers=1)
+        await service.start()
+        try:
+            # A worker killed from outside, as the OOM killer would, breaks the pool
+            os.kill(next(iter(service.executor._processes)), signal.SIGKILL)
+            await asyncio.sleep(0.5)
+            for name in ('first.txt', 'second.txt'):
+                await service.submit(shutil.copyfile, str(input_file), str(tmp_path / name))
+            return service.stats()
+        finally:
+            await service.stop()
+
+    stats = asyncio.run(run())
+
+    assert (tmp_path / 'second.txt').read_text(encoding='utf-8') == 'report'
+    assert stats['pool_restarts'] == 1
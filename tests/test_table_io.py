@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+import table_io
+from excel_processor import process_file
+
+def _write_csv(path, rows=30):
+    # Target Year holds years early on and text further down, as exports often do
+    lines = ['ID,Team,Status,Target Year,Date']
+    lines += [f"{i},Team A,Red,{2025 if i <= rows // 2 else 'FY26'},2026-0{i % 9 + 1}-01" for i in range(1, rows + 1)]
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(path)
+
+def test_csv_types_do_not_depend_on_chunk_size(tmp_path):
+    csv_file = _write_csv(tmp_path / 'input.csv')
+    expected = pd.read_csv(csv_file)
+    for chunk_size in (7, 50000):
+        batches = list(table_io.iter_csv_batches(csv_file, chunk_size))
+        assert {tuple(batch.dtypes) for batch in batches} == {tuple(expected.dtypes)}
+        pd.testing.assert_frame_equal(pd.concat(batches), expected)
+
+def test_parquet_output_takes_late_text_in_a_numeric_column(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    csv_file = _write_csv(tmp_path / 'input.csv')
+    # Settle types over the first batch only, so the file's schema meets 'FY26' later
+    monkeypatch.setattr(table_io, 'SCHEMA_ROWS', 10)
+
+    output_dir = tmp_path / 'output.parquet'
+    process_file(csv_file, str(output_dir), chunk_size=10)
+
+    data = pd.read_parquet(output_dir / 'Data.parquet')
+    assert data['Target Year'].tolist() == ['2025'] * 15 + ['FY26'] * 15
+    assert sorted(path.name for path in output_dir.iterdir()) == \
+        ['Count_by_Quarter.parquet', 'Data.parquet', 'Goal_Summary.parquet']
+
+def test_csv_cells_spanning_lines_across_blocks(tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')
+    # Small blocks make quoted line breaks fall on block boundaries
+    monkeypatch.setattr(table_io, 'CSV_BLOCK_SIZE', 64)
+    frame = pd.DataFrame({'ID': range(50), 'Description': [f"Line one of {i}\nline two\n\nline four" for i in range(50)]})
+    csv_file = tmp_path / 'input.csv'
+    frame.to_csv(csv_file, index=False)
+
+    batches = list(table_io.iter_csv_batches(str(csv_file), 7))
+
+    pd.testing.assert_frame_equal(pd.concat(batches), pd.read_csv(csv_file))
@@ -0,0 +1,18 @@
+import pandas as pd
+import pytest
+from excel_processor import process_file
+from verify_workbook import verify_workbook
+
+@pytest.mark.parametrize('dropped', ['Team', 'Status'])
+def test_default_pivots_of_an_input_without_a_key_column_verify(tmp_path, monkeypatch, dropped):
+    monkeypatch.delenv('EXCEL_CACHE_DIR', raising=False)
+    frame = pd.DataFrame({'ID': range(1, 7), 'Goal Set': 'LT', 'Team': ['A', 'B'] * 3,
+                          'Status': ['Red', 'Green', 'Red'] * 2, 'Date': '2026-02-01'})
+    input_file = tmp_path / 'input.xlsx'
+    frame.drop(columns=[dropped]).to_excel(input_file, index=False)
+    output_file = tmp_path / 'output.xlsx'
+    process_file(str(input_file), str(output_file), engine='openpyxl')
+
+    report = verify_workbook(str(output_file), reference_year=2026)
+
+    assert report['passed'], report['checks']
@@ -0,0 +1,16 @@
+import os
+import pytest
+from workbook_cache import prepare_cache_dir
+
+def test_cache_dir_is_created_private(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    prepare_cache_dir(str(cache_dir))
+    assert os.stat(cache_dir).st_mode & 0o077 == 0
+
+@pytest.mark.skipif(not hasattr(os, 'getuid'), reason="POSIX permissions only")
+def test_cache_dir_writable_by_others_is_refused(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    cache_dir.mkdir()
+    cache_dir.chmod(0o777)
+    with pytest.raises(PermissionError):
+        prepare_cache_dir(str(cache_dir))
@@ -0,0 +1,217 @@
+import argparse
+import json
+import math
+import os
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+import pandas as pd
+from date_utils import now
+from excel_processor import REQUIRED_COLUMNS, derive_quarters, pivot_sheet_frames
+from excel_reader import DEFAULT_CHUNK_SIZE, iter_sheet_batches, open_workbook
+from output_planner import DATA_SHEET, shard_file_name, shard_sheet_name
+from pivot_cube import PivotCube
+from pivot_spec import PivotPlan, PivotSpec, load_pivot_specs
+
+# Mismatches listed in the report per check; the counts always cover all of them
+MAX_EXAMPLES = 10
+
+def _cell(value):
+    """Normalize a cell value so blanks read back from a sheet compare equal to written blanks."""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    return value
+
+def _same(wanted, found) -> bool:
+    """Compare two cells, allowing numbers the last-digit rounding of a different summation order."""
+    if isinstance(wanted, float) and isinstance(found, (int, float)) and not isinstance(found, bool):
+        return math.isclose(wanted, found, rel_tol=1e-9)
+    return wanted == found
+
+def check_schema(header: List) -> Dict:
+    """Check the Data sheet has every required column, in order, followed by Quarter."""
+    expected = REQUIRED_COLUMNS + ['Quarter']
+    return {
+        'check': 'schema',
+        'passed': list(header) == expected,
+        'missing_columns': [column for column in expected if column not in header],
+        'unexpected_columns': [column for column in header if column not in expected],
+    }
+
+def check_pivot_sheet(sheet_name: str, expected: pd.DataFrame, rows: List[tuple]) -> Dict:
+    """Compare every cell of a pivot sheet, margins included, with the table recomputed from the Data sheet."""
+    expected_rows = [tuple(expected.columns)]
+    expected_rows += list(expected.astype(object).itertuples(index=False, name=None))
+
+    # Written rows are at least as wide as the expected table; anything past it must be blank
+    width = max([len(expected.columns)] + [len(row) for row in rows])
+    mismatches = []
+    for row_number in range(max(len(expected_rows), len(rows))):
+        wanted = expected_rows[row_number] if row_number < len(expected_rows) else ()
+        found = rows[row_number] if row_number < len(rows) else ()
+        for column_number in range(width):
+            wanted_value = _cell(wanted[column_number]) if column_number < len(wanted) else ""
+            found_value = _cell(found[column_number]) if column_number < len(found) else ""
+            if not _same(wanted_value, found_value):
+                mismatches.append({'row': row_number + 1, 'column': column_number + 1,
+                                   'expected': wanted_value, 'found': found_value})
+
+    return {
+        'check': f'pivot:{sheet_name}',
+        'passed': not mismatches,
+        'cells': len(expected_rows) * width,
+        'mismatches': len(mismatches),
+        'examples': mismatches[:MAX_EXAMPLES],
+    }
+
+def data_batches(workbook, output_file: str, shard_files: bool = False,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """Yield (shard, batch) for every shard of the Data sheet in order.
+
+    Shards are the Data, Data 2, ... sheets of the workbook and, with
+    shard_files, the Data sheets of out_2.xlsx, out_3.xlsx, ... next to it.
+    """
+    shard = 0
+    while shard_sheet_name(shard) in workbook.sheetnames:
+        for batch in iter_sheet_batches(workbook[shard_sheet_name(shard)], chunk_size):
+            yield shard_sheet_name(shard), batch
+        shard += 1
+
+    shard = 1
+    while shard_files and os.path.exists(shard_file_name(output_file, shard)):
+        shard_workbook = open_workbook(shard_file_name(output_file, shard))
+        try:
+            for batch in iter_sheet_batches(shard_workbook[DATA_SHEET], chunk_size):
+                yield shard_file_name(output_file, shard), batch
+        finally:
+            shard_workbook.close()
+        shard += 1
+
+def verify_workbook(output_file: str, reference_year: Optional[int] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE, shard_files: bool = False,
+                    pivot_specs: Optional[List[PivotSpec]] = None) -> Dict:
+    """Verify a processed workbook in one read-only pass and return a pass/fail report.
+
+    The Data sheet is streamed once: its header is checked against the
+    required schema, each batch's quarter labels are recomputed from Date and
+    compared with the Quarter column, and the batch is counted into a pivot
+    cube. The Goal Summary and Count by Quarter sheets are then compared
+    cell by cell, margins included, with the tables rolled up from that cube.
+    Quarter labels are relative to reference_year, the current year by default.
+    A Data sheet split into shards is read shard by shard; see data_batches.
+    Given the pivot_specs the workbook was written with, their sheets are
+    checked instead of the default two. A key column blank throughout is
+    taken as the "" placeholder written for a column the input lacked,
+    unless the sheets show its rows were left out.
+    """
+    if reference_year is None:
+        reference_year = now().year
+
+    checks = []
+    workbook = open_workbook(output_file)
+    try:
+        sheet_names = workbook.sheetnames
+        if 'Data' not in sheet_names:
+            checks.append({'check': 'sheet:Data', 'passed': False})
+            return {'file': output_file, 'passed': False, 'checks': checks}
+
+        plan = PivotPlan(pivot_specs) if pivot_specs else None
+        cube = PivotCube() if plan is None else None
+        blank_keys = set(plan.key_columns() if plan is not None else cube.keys) - {'Quarter'}
+        schema = None
+        shards = set()
+        quarters = {'check': 'quarters', 'passed': True, 'rows': 0, 'mismatches': 0, 'examples': []}
+        for shard, batch in data_batches(workbook, output_file, shard_files, chunk_size):
+            # Every shard repeats the header, so each one's schema is checked
+            if shard not in shards:
+                shards.add(shard)
+                shard_schema = check_schema(list(batch.columns))
+                if schema is None or not shard_schema['passed']:
+                    schema = dict(shard_schema, shard=shard)
+                if shard_schema['missing_columns']:
+                    break
+
+            # Blank quarter cells read back as missing; they were written as ""
+            found = batch['Quarter'].astype(object).where(batch['Quarter'].notna(), "")
+            expected = derive_quarters(batch['Date'], reference_year=reference_year).astype(object)
+            differs = (found != expected).to_numpy()
+            for position in differs.nonzero()[0][:MAX_EXAMPLES - len(quarters['examples'])]:
+                quarters['examples'].append({
+                    'shard': shard,
+                    'row': int(batch.index[position]) + 2,  # Sheet row, after the header
+                    'date': str(batch['Date'].iloc[position]),
+                    'expected': expected.iloc[position],
+                    'found': found.iloc[position],
+                })
+            quarters['mismatches'] += int(differs.sum())
+            quarters['rows'] += len(batch)
+
+            # Count the batch with the quarters as written, to reconcile the pivots against the sheet itself
+            written = batch.assign(Quarter=found)
+            if plan is None:
+                cube.update(written)
+            else:
+                plan.update(written)
+            blank_keys = {column for column in blank_keys if column in batch and batch[column].isna().all()}
+
+        checks.append(schema)
+        if schema['missing_columns']:
+            return {'file': output_file, 'passed': False, 'checks': checks}
+        quarters['passed'] = quarters['mismatches'] == 0
+        checks.append(quarters)
+
+        # A key column blank throughout was either missing from the input, and pivoted as a
+        # placeholder of "", or present but empty, leaving its rows out of the pivots
+        counts = cube if plan is None else plan
+        dropped_sheets = pivot_sheet_frames(cube) if plan is None else plan.frames()
+        for column in blank_keys:
+            counts.fill_missing_keys(column, "")
+        expected_sheets = pivot_sheet_frames(cube) if plan is None else plan.frames()
+        for sheet_name, expected in expected_sheets.items():
+            if sheet_name not in sheet_names:
+                checks.append({'check': f'pivot:{sheet_name}', 'passed': False, 'missing_sheet': True})
+                continue
+            sheet = workbook[sheet_name]
+            sheet.reset_dimensions()
+            rows = list(sheet.iter_rows(values_only=True))
+            check = check_pivot_sheet(sheet_name, expected, rows)
+            if not check['passed'] and blank_keys:
+                dropped = check_pivot_sheet(sheet_name, dropped_sheets[sheet_name], rows)
+                check = dropped if dropped['passed'] else check
+            checks.append(check)
+    finally:
+        workbook.close()
+
+    return {'file': output_file, 'passed': all(check['passed'] for check in checks), 'checks': checks}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the verifier command line and return the process exit code."""
+    parser = argparse.ArgumentParser(description="Verify a processed workbook's schema, quarters and pivot tables.")
+    parser.add_argument('output_file', nargs='?', default='test_output.xlsx', help="workbook to verify")
+    parser.add_argument('--report', help="write the JSON report to this file instead of stdout")
+    parser.add_argument('--reference-year', type=int, help="year quarter labels are relative to (default: this year)")
+    parser.add_argument('--pivot-spec', help="JSON or YAML pivot spec the output was written with")
+    parser.add_argument('--shard-files', action='store_true',
+                        help="the Data sheet continues in <output>_2.xlsx, <output>_3.xlsx, ... (process --shard-files)")
+    args = parser.parse_args(argv)
+
+    try:
+        pivot_specs = load_pivot_specs(args.pivot_spec) if args.pivot_spec else None
+        report = verify_workbook(args.output_file, args.reference_year, shard_files=args.shard_files,
+                                 pivot_specs=pivot_specs)
+    except Exception as e:
+        print(f"Error reading Excel file: {str(e)}", file=sys.stderr)
+        return 2
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+    else:
+        print(json.dumps(report, indent=2, default=str))
+
+    failed = [check['check'] for check in report['checks'] if not check['passed']]
+    print(f"{'PASSED' if report['passed'] else 'FAILED'}: {args.output_file}"
+          + (f" ({', '.join(failed)})" if failed else ""), file=sys.stderr)
+    return 0 if report['passed'] else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+import hashlib
+import os
+import pickle
+import pandas as pd
+from typing import Dict, Iterator, Optional, Tuple
+from excel_reader import DEFAULT_CHUNK_SIZE, iter_excel_batches
+from table_io import detect_format, iter_batches
+
+# Bump when the on-disk entry layout changes so stale entries are never read
+CACHE_VERSION = 2
+DEFAULT_MAX_CACHE_BYTES = 2 * 1024 ** 3
+
+# File hashes already computed in this process, keyed by (path, size, mtime)
+_hash_memo: Dict[Tuple[str, int, int], str] = {}
+
+def get_cache_dir(cache_dir: Optional[str] = None) -> Optional[str]:
+    """Resolve the cache directory, falling back to EXCEL_CACHE_DIR. None disables caching."""
+    return cache_dir or os.environ.get('EXCEL_CACHE_DIR') or None
+
+def get_max_cache_bytes() -> int:
+    """Return the cache size limit, configurable through EXCEL_CACHE_MAX_BYTES."""
+    return int(os.environ.get('EXCEL_CACHE_MAX_BYTES', DEFAULT_MAX_CACHE_BYTES))
+
+def file_hash(input_file: str) -> str:
+    """Return the SHA-256 of a file's contents, reusing the result while the file is unchanged."""
+    stat = os.stat(input_file)
+    memo_key = (os.path.abspath(input_file), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _hash_memo:
+        digest = hashlib.sha256()
+        with open(input_file, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        _hash_memo[memo_key] = digest.hexdigest()
+    return _hash_memo[memo_key]
+
+def _entry_path(cache_dir: str, input_file: str, name: str) -> str:
+    """Return the cache path for one named entry of a file."""
+    # Entries are also keyed by pandas version since pickles don't travel across versions
+    name_key = hashlib.sha256(f"{CACHE_VERSION}|{pd.__version__}|{name}".encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{file_hash(input_file)}-{name_key}")
+
+def prepare_cache_dir(cache_dir: str) -> None:
+    """Create the cache directory private to the current user, refusing one anyone else can write to.
+
+    Entries are pickles, and loading a pickle can run code, so only the
+    user reading the cache may be able to add entries to it.
+    """
+    os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    stat = os.stat(cache_dir)
+    if hasattr(os, 'getuid') and (stat.st_uid != os.getuid() or stat.st_mode & 0o022):
+        raise PermissionError(f"Cache directory {cache_dir} must be owned by the current user and not "
+                              f"writable by others; run 'chmod 700 {cache_dir}' or choose another directory")
+
+def cache_entry_path(input_file: str, name: str, cache_dir: Optional[str] = None) -> Optional[str]:
+    """Return where a named artefact derived from a file is cached, or None when caching is off.
+
+    Entries live alongside the cached sheets and are evicted with them.
+    """
+    cache_dir = get_cache_dir(cache_dir)
+    if cache_dir is None:
+        return None
+    prepare_cache_dir(cache_dir)
+    return _entry_path(cache_dir, input_file, name)
+
+def _touch(path: str) -> None:
+    """Mark a cache entry as recently used."""
+    os.utime(path, None)
+
+def evict(cache_dir: str, max_bytes: Optional[int] = None, keep: Optional[str] = None) -> None:
+    """Delete least recently used entries until the cache fits within max_bytes."""
+    if max_bytes is None:
+        max_bytes = get_max_cache_bytes()
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.endswith('.tmp') or not os.path.isfile(path):
+            continue
+        stat = os.stat(path)
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        os.remove(path)
+        total -= size
+
+def _read_batches(path: str) -> Iterator[pd.DataFrame]:
+    """Yield the batches stored in a cache entry, one at a time."""
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+def _cache_batches(path: str, batches: Iterator[pd.DataFrame], cache_dir: str) -> Iterator[pd.DataFrame]:
+    """Pass batches through while writing them to a new cache entry."""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    complete = False
+    try:
+        with open(temp_path, 'wb') as f:
+            for batch in batches:
+                pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+                yield batch
+        complete = True
+    finally:
+        # Only publish entries for sheets that were read to the end
+        if complete:
+            os.replace(temp_path, path)
+            evict(cache_dir, keep=path)
+        elif os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def load_batches(input_file: str, sheet_name: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 cache_dir: Optional[str] = None,
+                 input_format: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame batches for a sheet, served from the cache when the file is unchanged.
+
+    On a miss the sheet is streamed from the workbook with iter_excel_batches
+    and written to the cache as it goes. On a hit the stored batches are
+    replayed without touching the xlsx, in the chunk size they were cached with.
+    CSV, Parquet and Arrow inputs are read directly, as they parse faster
+    than a cache entry could be replayed.
+    """
+    if detect_format(input_file, input_format) != 'xlsx':
+        return iter_batches(input_file, sheet_name, chunk_size, input_format)
+
+    cache_dir = get_cache_dir(cache_dir)
+    if cache_dir is None:
+        return iter_excel_batches(input_file, sheet_name, chunk_size)
+
+    prepare_cache_dir(cache_dir)
+    path = _entry_path(cache_dir, input_file, f"sheet|{sheet_name}")
+    if os.path.exists(path):
+        _touch(path)
+        return _read_batches(path)
+    return _cache_batches(path, iter_excel_batches(input_file, sheet_name, chunk_size), cache_dir)